@@ -1,16 +1,15 @@
 import sys
 import os
-import importlib
+import importlib.util
 
 # --- Import from our new modules ---
 from modules.utils import (
     load_config, save_config, check_and_install_dependencies,
-    load_site_configs, SITE_CONFIGS_DIR, print_progress_bar, scrape_chapter_content
+    load_site_configs, SITE_CONFIGS_DIR, print_progress_bar
 )
 from modules.admin_tools import manage_stories, update_site_configs
-from modules.link_manager import scrape_new_story_links, check_for_updates, check_for_revived_links
-from modules.content_manager import assemble_chapter_list, scrape_story_content
-from modules.converter_tools import create_epub_from_files, create_edge_html_from_file, create_mp3s_from_file
+# Link, content and converter modules are imported inside their menu branches,
+# so picking one feature never loads the libraries the others depend on.
 
 # --- Dependency Flags ---
 PLAYWRIGHT_INSTALLED = False
@@ -28,15 +27,12 @@ def run_startup_checks():
     print(f"🐍 Running with Python interpreter located at: {sys.executable}")
     
     # Set initial global flags for dependencies
+    # find_spec only locates the packages; nothing is imported until a feature needs it
     global PLAYWRIGHT_INSTALLED, EBOOKLIB_INSTALLED, GTTS_INSTALLED, REQUESTS_INSTALLED
-    try: import playwright; PLAYWRIGHT_INSTALLED = True
-    except ImportError: pass
-    try: from ebooklib import epub; EBOOKLIB_INSTALLED = True
-    except ImportError: pass
-    try: from gtts import gTTS; GTTS_INSTALLED = True
-    except ImportError: pass
-    try: import requests; REQUESTS_INSTALLED = True
-    except ImportError: pass
+    PLAYWRIGHT_INSTALLED = importlib.util.find_spec('playwright') is not None
+    EBOOKLIB_INSTALLED = importlib.util.find_spec('ebooklib') is not None
+    GTTS_INSTALLED = importlib.util.find_spec('gtts') is not None
+    REQUESTS_INSTALLED = importlib.util.find_spec('requests') is not None
 
     # Core dependency check
     if not PLAYWRIGHT_INSTALLED:
@@ -58,6 +54,7 @@ def run_startup_checks():
 # --- Main Menu ---
 def main_menu():
     """Displays the main menu and handles user choices."""
+    global SITE_CONFIGS
     config = load_config()
     while True:
         print("\n" + "─"*10 + " 📘 Web Novel Scraper Suite 📘 " + "─"*10)
@@ -81,29 +78,39 @@ def main_menu():
         # Route to the correct function, with on-demand dependency checks
         if choice == '1': 
             if check_and_install_dependencies(['playwright']):
+                from modules.link_manager import scrape_new_story_links
                 scrape_new_story_links(config, SITE_CONFIGS)
         elif choice == '2': 
             if check_and_install_dependencies(['playwright', 'requests']):
+                from modules.link_manager import check_for_updates
                 # FIX: Pass the loaded config object to the function.
                 check_for_updates(config, SITE_CONFIGS)
         elif choice == '3':
              if check_and_install_dependencies(['playwright']):
+                from modules.link_manager import check_for_revived_links
                 # FIX: Pass the loaded config object to the function.
                 check_for_revived_links(config, SITE_CONFIGS)
         elif choice == '4':
+            from modules.content_manager import assemble_chapter_list
             assemble_chapter_list()
         elif choice == '5': 
             if check_and_install_dependencies(['playwright']):
+                from modules.content_manager import scrape_story_content
                 scrape_story_content(config, SITE_CONFIGS)
         elif choice == '6': 
+            from modules.converter_tools import create_epub_from_files
             create_epub_from_files()
         elif choice == '7':
+            from modules.converter_tools import create_edge_html_from_file
             create_edge_html_from_file()
         elif choice == '8': 
-            create_mp3s_from_file()
+            from modules.converter_tools import create_mp3s_from_file
+            create_mp3s_from_file(config)
         elif choice == '9': 
             if check_and_install_dependencies(['requests']):
                 update_site_configs(config)
+                # Only the plugin files that changed are re-imported
+                SITE_CONFIGS = load_site_configs()
         elif choice == '10':
             manage_stories()
         elif choice == '11':
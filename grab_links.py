@@ -1,30 +1,64 @@
 import json
 import re
+import hashlib
 from playwright.sync_api import sync_playwright, TimeoutError
 import math
 import sys
 import os
 import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Optional Fast JSON ---
+try:
+    import orjson
+    ORJSON_INSTALLED = True
+except ImportError:
+    ORJSON_INSTALLED = False
+
+# --- Optional HTTP Client ---
+try:
+    import requests
+    REQUESTS_INSTALLED = True
+except ImportError:
+    REQUESTS_INSTALLED = False
+
+# --- Precompiled Patterns ---
+# Bytes pattern so it can run on the raw HTTP body without decoding it first
+_RR_CHAPTERS_RE = re.compile(rb'window\.chapters\s*=\s*(\[.*?\]);', re.DOTALL)
 
 # --- Constants ---
 STORIES_DB_FILE = "stories.json"
+BROWSER_PROFILE_DIR = ".pw_profile" # Keeps cookie/consent state between runs
 
 # --- Database Functions ---
 def load_stories_db():
     """Loads the stories database from the JSON file."""
     if not os.path.exists(STORIES_DB_FILE):
         return {}
-    with open(STORIES_DB_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {}
+    with open(STORIES_DB_FILE, "rb") as f:
+        data = f.read()
+    try:
+        return orjson.loads(data) if ORJSON_INSTALLED else json.loads(data)
+    except (ValueError, json.JSONDecodeError):
+        return {}
 
 def save_stories_db(db):
-    """Saves the stories database to the JSON file."""
-    with open(STORIES_DB_FILE, "w", encoding="utf-8") as f:
-        json.dump(db, f, indent=4)
+    """Saves the stories database to the JSON file, skipping the write if nothing changed."""
+    if ORJSON_INSTALLED:
+        data = orjson.dumps(db, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(db, indent=4).encode("utf-8")
+    try:
+        with open(STORIES_DB_FILE, "rb") as f:
+            if f.read() == data:
+                return
+    except OSError:
+        pass
+    # Write to a temporary file and swap it in, so a crash mid-save never leaves a truncated database
+    tmp_path = STORIES_DB_FILE + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, STORIES_DB_FILE)
 
 # --- Scraping Functions ---
 def get_scribblehub_links(page):
@@ -34,79 +68,128 @@ def get_scribblehub_links(page):
     print("⏳ Waiting for all chapters to load... (this might take a minute or two)")
     page.wait_for_selector("#pagination-mesh-toc", state="hidden", timeout=120000)
     print("✅ TOC fully loaded.")
-    links = page.query_selector_all(".toc_ol .toc_a")
+    # Collect every href in one browser round-trip instead of one call per link
+    hrefs = page.eval_on_selector_all(".toc_ol .toc_a", "els => els.map(e => e.getAttribute('href'))")
     base_url = "https://www.scribblehub.com"
-    urls = []
-    for link in links:
-        href = link.get_attribute("href")
-        if href:
-            urls.append(base_url + href.strip() if href.startswith('/') else href.strip())
-    return urls
+    return [base_url + href.strip() if href.startswith('/') else href.strip() for href in hrefs if href]
 
 def get_royalroad_links(page):
     """Scrapes all chapter links from a Royal Road fiction page."""
     print("🔍 Extracting Royal Road links from page data...")
-    script_content = page.content()
-    match = re.search(r'window\.chapters\s*=\s*(\[.*?\]);', script_content)
-    if not match:
-        print("❌ Could not find chapter data script block.")
+    # Read the chapter list straight from the page's JS runtime instead of regex-scanning the HTML
+    chapters_data = page.evaluate("() => window.chapters")
+    if not chapters_data:
+        print("❌ Could not find chapter data on the page.")
         return []
+    base_url = "https://www.royalroad.com"
+    return [base_url + chapter['url'] for chapter in chapters_data if chapter.get('url')]
+
+def get_royalroad_links_via_http(story_url):
+    """
+    Fetches a Royal Road fiction page over plain HTTP and reads the embedded chapter list,
+    with no browser needed. Returns links in the same order as the browser path, or [] on failure.
+    """
     try:
-        chapters_data = json.loads(match.group(1))
+        response = requests.get(story_url, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
+        response.raise_for_status()
+        match = _RR_CHAPTERS_RE.search(response.content)
+        if not match:
+            return []
         base_url = "https://www.royalroad.com"
-        return [base_url + chapter['url'] for chapter in chapters_data]
-    except (json.JSONDecodeError, KeyError) as e:
-        print(f"❌ Failed to parse chapter data: {e}")
+        urls = [base_url + chapter['url'] for chapter in json.loads(match.group(1)) if chapter.get('url')]
+    except (requests.RequestException, ValueError, KeyError) as e:
+        print(f"⚠️ HTTP fetch failed ({e}); falling back to the browser.")
         return []
+    urls.reverse()
+    print(f"✅ Found {len(urls)} chapter links.")
+    return urls
 
-def get_all_chapter_links(story_url):
-    """Launches a browser and scrapes chapter links from either site."""
-    print("🌐 Launching browser...")
+def launch_context(p):
+    """Launches Chromium with the persistent profile so cookie consent survives between runs."""
+    return p.chromium.launch_persistent_context(user_data_dir=BROWSER_PROFILE_DIR, headless=False)
+
+def _scrape_with_page(page, story_url):
+    """Scrapes chapter links from either site using an already-open page."""
     urls = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
+    try:
+        print(f"📄 Loading story page: {story_url}")
+        page.goto(story_url, timeout=60000)
         try:
-            print(f"📄 Loading story page: {story_url}")
-            page.goto(story_url, timeout=60000)
-            try:
-                page.get_by_role("button", name="Got it!").click(timeout=5000)
-                print("✅ Cookie consent accepted.")
-            except TimeoutError:
-                print("👍 No cookie consent banner found.")
-
-            if "scribblehub.com" in story_url:
-                page.wait_for_selector(".toc_ol", timeout=30000)
-                urls = get_scribblehub_links(page)
-            elif "royalroad.com" in story_url:
-                page.wait_for_selector("#chapters", timeout=30000)
-                urls = get_royalroad_links(page)
-            
-            if urls:
-                print("🔃 Reversing chapter order to chronological...")
-                urls.reverse()
+            # Short wait: once consent is stored in the profile the banner no longer appears
+            page.get_by_role("button", name="Got it!").click(timeout=1500)
+            print("✅ Cookie consent accepted.")
         except TimeoutError:
-            print("\n❌ Timed out waiting for the page to load.")
-        except Exception as e:
-            print(f"❌ An error occurred: {e}")
+            print("👍 No cookie consent banner found.")
+
+        if "scribblehub.com" in story_url:
+            page.wait_for_selector(".toc_ol", timeout=30000)
+            urls = get_scribblehub_links(page)
+        elif "royalroad.com" in story_url:
+            page.wait_for_selector("#chapters", timeout=30000)
+            urls = get_royalroad_links(page)
+        
+        if urls:
+            print("🔃 Reversing chapter order to chronological...")
+            urls.reverse()
+    except TimeoutError:
+        print("\n❌ Timed out waiting for the page to load.")
+    except Exception as e:
+        print(f"❌ An error occurred: {e}")
+    print(f"✅ Found {len(urls)} chapter links.")
+    return urls
+
+def get_all_chapter_links(story_url, context=None):
+    """Scrapes chapter links in a new page of `context`, or launches a browser just for this call."""
+    if context is not None:
+        page = context.new_page()
+        try:
+            return _scrape_with_page(page, story_url)
+        finally:
+            page.close()
+
+    print("🌐 Launching browser...")
+    with sync_playwright() as p:
+        context = launch_context(p)
+        try:
+            return get_all_chapter_links(story_url, context)
         finally:
-            browser.close()
-            print(f"✅ Found {len(urls)} chapter links.")
-            return urls
+            context.close()
 
 # --- File Handling & UI ---
+_progress_bar_state = {"last": None} # The last line drawn by print_progress_bar
+
 def print_progress_bar(iteration, total, prefix='', suffix='', length=50, fill='█'):
     """
     Call in a loop to create a terminal progress bar.
     """
-    percent = ("{0:.1f}").format(100 * (iteration / float(total)))
-    filled_length = int(length * iteration // total)
+    percent = f"{100 * iteration / total:.1f}"
+    filled_length = length * iteration // total
+    # Consecutive calls often land on the same bar and percentage; only redraw when the line would change
+    frame = (prefix, suffix, percent, filled_length)
+    if frame == _progress_bar_state["last"] and iteration != total:
+        return
+    _progress_bar_state["last"] = None if iteration == total else frame
     bar = fill * filled_length + '-' * (length - filled_length)
     sys.stdout.write(f'\r{prefix} |{bar}| {percent}% {suffix}')
     sys.stdout.flush()
     if iteration == total:
         print()
 
+def urls_digest(urls):
+    """Returns a SHA-256 fingerprint of an ordered list of URLs."""
+    h = hashlib.sha256()
+    for url in urls:
+        h.update(url.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+def chunk_filenames(base_name, chunk_size, total):
+    """Returns the file names save_chunks will write for `total` links."""
+    return [
+        f"{base_name} {start + 1}-{min(start + chunk_size, total)}.txt"
+        for start in range(0, total, chunk_size)
+    ]
+
 def save_chunks(urls, base_name, chunk_size, output_dir):
     """Saves a list of URLs into multiple text files with a progress bar."""
     if not urls:
@@ -116,21 +199,23 @@ def save_chunks(urls, base_name, chunk_size, output_dir):
     print(f"\n📦 Saving {total} links into {chunks} file(s) in '{output_dir}'...")
     
     print_progress_bar(0, chunks, prefix='Progress:', suffix='Complete', length=50)
-    for i in range(chunks):
-        start_index = i * chunk_size
-        end_index = min(start_index + chunk_size, total)
-        chunk_data = urls[start_index:end_index]
-        start_chap = start_index + 1
-        end_chap = end_index
-        filename = os.path.join(output_dir, f"{base_name} {start_chap}-{end_chap}.txt")
+    redraw_every = max(1, chunks // 50)
+    # Work out every (path, slice) pair up front so the loop only does file I/O
+    jobs = [
+        (os.path.join(output_dir, name), urls[start:start + chunk_size])
+        for name, start in zip(chunk_filenames(base_name, chunk_size, total), range(0, total, chunk_size))
+    ]
+    for i, (filename, chunk_data) in enumerate(jobs):
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write("\n".join(chunk_data) + "\n")
+            # Encode once and write raw bytes, skipping the text-layer wrapper
+            with open(filename, "wb") as f:
+                f.write(("\n".join(chunk_data) + "\n").encode("utf-8"))
         except Exception as e:
             print(f"\n❌ Failed to save {filename}: {e}")
         
-        time.sleep(0.05)
-        print_progress_bar(i + 1, chunks, prefix='Progress:', suffix='Complete', length=50)
+        # Only redraw when the bar would visibly move
+        if (i + 1) % redraw_every == 0 or i + 1 == chunks:
+            print_progress_bar(i + 1, chunks, prefix='Progress:', suffix='Complete', length=50)
     print() # Final newline after bar is done
 
 def read_all_links_from_folder(folder_path):
@@ -141,8 +226,9 @@ def read_all_links_from_folder(folder_path):
     try:
         files = sorted([f for f in os.listdir(folder_path) if f.endswith('.txt')])
         for filename in files:
-            with open(os.path.join(folder_path, filename), 'r', encoding='utf-8') as f:
-                all_urls.extend([line.strip() for line in f if line.strip()])
+            # One read and a C-level splitlines per file, stripping each line only once
+            with open(os.path.join(folder_path, filename), 'rb') as f:
+                all_urls.extend(link for line in f.read().decode('utf-8').splitlines() if (link := line.strip()))
     except Exception as e:
         print(f"Could not read link files: {e}")
     return all_urls
@@ -193,6 +279,7 @@ def scrape_new_story():
         "chunk_size": chunk_size,
         "output_dir": output_dir,
         "last_chapter_count": len(urls),
+        "urls_sha256": urls_digest(urls),
         "last_scraped_date": datetime.datetime.now().isoformat(),
         "is_complete": False
     }
@@ -215,48 +302,91 @@ def check_for_updates():
     total_stories = len(active_stories)
     print(f"Found {total_stories} active stories to check...")
     
+    # Royal Road lists only need an HTTP GET, so fetch them all up front in parallel
+    prefetched = {}
+    if REQUESTS_INSTALLED:
+        rr_stories = [(name, data['story_url']) for name, data in active_stories.items() if "royalroad.com" in data['story_url']]
+        if rr_stories:
+            print(f"🌐 Fetching {len(rr_stories)} Royal Road chapter list(s) over HTTP...")
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = executor.map(get_royalroad_links_via_http, [url for _, url in rr_stories])
+                prefetched = dict(zip((name for name, _ in rr_stories), results))
+
     updates_found_overall = False
-    for i, (name, data) in enumerate(active_stories.items()):
-        print(f"\n--- [{i+1}/{total_stories}] Checking '{name}' ---")
+    playwright, context = None, None
+    try:
+        for i, (name, data) in enumerate(active_stories.items()):
+            print(f"\n--- [{i+1}/{total_stories}] Checking '{name}' ---")
+    
+            current_urls = prefetched.get(name, [])
+            if not current_urls:
+                # One browser for every story that needs it, launched on first use
+                if context is None:
+                    print("🌐 Launching browser...")
+                    playwright = sync_playwright().start()
+                    context = launch_context(playwright)
+                current_urls = get_all_chapter_links(data['story_url'], context)
+            if not current_urls:
+                print("Could not retrieve current chapters. Skipping.")
+                continue
+        
+            # The stored fingerprint answers "anything new?" without reading the link files
+            current_digest = urls_digest(current_urls)
+            if data.get('urls_sha256') == current_digest:
+                print("✅ No changes found.")
+                continue
+
+            existing_urls = read_all_links_from_folder(data['output_dir'])
+            # Fast path for the common case: nothing changed, so no sets need building
+            if existing_urls == current_urls:
+                # Records saved before fingerprints existed get one now
+                db[name]['urls_sha256'] = current_digest
+                save_stories_db(db)
+                print("✅ No changes found.")
+                continue
+    
+            current_set = set(current_urls)
+            existing_set = set(existing_urls)
+
+            # Single pass keeps the story's chapter order without a quadratic sort
+            new_urls = [url for url in current_urls if url not in existing_set]
+            removed_urls = [url for url in existing_urls if url not in current_set]
+
+            if not new_urls and not removed_urls:
+                print("✅ No changes found.")
+                continue
+
+            updates_found_overall = True
+            print(f"✨ Found Changes for '{name}':")
+            if new_urls:
+                print(f"  + {len(new_urls)} new chapters added.")
+            if removed_urls:
+                print(f"  - {len(removed_urls)} chapters removed.")
         
-        current_urls = get_all_chapter_links(data['story_url'])
-        if not current_urls:
-            print("Could not retrieve current chapters. Skipping.")
-            continue
-            
-        existing_urls = read_all_links_from_folder(data['output_dir'])
+            proceed = input("Do you want to update your local files? (y/n): ").strip().lower()
+            if proceed in ['y', 'yes']:
+                print("Updating files...")
+                # Files save_chunks is about to rewrite get truncated anyway; only remove the leftovers
+                targets = set(chunk_filenames(data['base_name'], data['chunk_size'], len(current_urls)))
+                with os.scandir(data['output_dir']) as entries:
+                    for entry in entries:
+                        if entry.name not in targets:
+                            os.unlink(entry.path)
         
-        current_set = set(current_urls)
-        existing_set = set(existing_urls)
-
-        new_urls = sorted(list(current_set - existing_set), key=current_urls.index)
-        removed_urls = list(existing_set - current_set)
-
-        if not new_urls and not removed_urls:
-            print("✅ No changes found.")
-            continue
-
-        updates_found_overall = True
-        print(f"✨ Found Changes for '{name}':")
-        if new_urls:
-            print(f"  + {len(new_urls)} new chapters added.")
-        if removed_urls:
-            print(f"  - {len(removed_urls)} chapters removed.")
-            
-        proceed = input("Do you want to update your local files? (y/n): ").strip().lower()
-        if proceed in ['y', 'yes']:
-            print("Updating files...")
-            for filename in os.listdir(data['output_dir']):
-                os.remove(os.path.join(data['output_dir'], filename))
-            
-            save_chunks(current_urls, data['base_name'], data['chunk_size'], data['output_dir'])
-
-            db[name]['last_chapter_count'] = len(current_urls)
-            db[name]['last_scraped_date'] = datetime.datetime.now().isoformat()
-            save_stories_db(db)
-            print("✅ Update complete.")
-        else:
-            print("Update cancelled.")
+                save_chunks(current_urls, data['base_name'], data['chunk_size'], data['output_dir'])
+
+                db[name]['last_chapter_count'] = len(current_urls)
+                db[name]['urls_sha256'] = current_digest
+                db[name]['last_scraped_date'] = datetime.datetime.now().isoformat()
+                save_stories_db(db)
+                print("✅ Update complete.")
+            else:
+                print("Update cancelled.")
+    finally:
+        if context is not None:
+            context.close()
+        if playwright is not None:
+            playwright.stop()
     
     if not updates_found_overall:
         print("\n✅ All active stories are up to date.")
@@ -269,29 +399,36 @@ def manage_stories():
         print("No stories are currently being tracked.")
         return
         
-    stories = list(db.keys())
-    while True:
-        print("\nYour tracked stories:")
-        for i, name in enumerate(stories):
-            status = "Complete" if db[name].get('is_complete') else "Active"
-            print(f"  {i+1}: {name} ({status})")
-        print("  0: Back to Main Menu")
+    stories = list(db)
+    # Status labels are worked out once and only the toggled entry is updated afterwards
+    statuses = ["Complete" if db[name].get('is_complete') else "Active" for name in stories]
+    dirty = False
+    try:
+        while True:
+            print("\nYour tracked stories:")
+            for i, (name, status) in enumerate(zip(stories, statuses)):
+                print(f"  {i+1}: {name} ({status})")
+            print("  0: Back to Main Menu")
 
-        try:
-            choice = int(input("\nEnter the number of a story to toggle its status: ").strip())
-            if choice == 0:
-                break
-            if 1 <= choice <= len(stories):
-                story_name = stories[choice - 1]
-                current_status = db[story_name].get('is_complete', False)
-                db[story_name]['is_complete'] = not current_status
-                save_stories_db(db)
-                new_status = "Complete" if not current_status else "Active"
-                print(f"✅ '{story_name}' has been marked as {new_status}.")
-            else:
-                print("⚠️ Invalid number.")
-        except ValueError:
-            print("⚠️ Please enter a valid number.")
+            try:
+                choice = int(input("\nEnter the number of a story to toggle its status: ").strip())
+                if choice == 0:
+                    break
+                if 1 <= choice <= len(stories):
+                    story_name = stories[choice - 1]
+                    entry = db[story_name]
+                    entry['is_complete'] = not entry.get('is_complete', False)
+                    dirty = True
+                    statuses[choice - 1] = "Complete" if entry['is_complete'] else "Active"
+                    print(f"✅ '{story_name}' has been marked as {statuses[choice - 1]}.")
+                else:
+                    print("⚠️ Invalid number.")
+            except ValueError:
+                print("⚠️ Please enter a valid number.")
+    finally:
+        # Toggles are saved in one write when leaving the menu, however it is left
+        if dirty:
+            save_stories_db(db)
 
 def main_menu():
     """Displays the main menu and handles user choices."""
@@ -1,8 +1,15 @@
 import os
 import json
-import requests
+import hashlib
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from .utils import load_stories_db, save_stories_db, save_config, check_and_install_dependencies
 
+# --- Constants ---
+DOWNLOAD_WORKERS = 8 # Site config files fetched from GitHub at the same time
+LISTING_CACHE_FILE = os.path.join("site_configs", "_listing_cache.json") # Last GitHub listing and its ETag
+GITHUB_API_HOST = "api.github.com" # The only host the user's GitHub token is ever sent to
+
 def manage_stories():
     """Allows the user to mark stories as complete or active."""
     print("\n" + "─"*10 + " Manage Tracked Stories " + "─"*10)
@@ -11,26 +18,67 @@ def manage_stories():
         print("No stories are currently being tracked.")
         return
         
-    stories = list(db.keys())
-    while True:
-        print("\nYour tracked stories:")
-        for i, name in enumerate(stories):
-            status = "Complete" if db[name].get('is_complete') else "Active"
-            print(f"  {i+1}: {name} ({status})")
-        print("  0: Back to Main Menu")
-        try:
-            choice = int(input("\nEnter number to toggle status: ").strip())
-            if choice == 0:
-                break
-            if 1 <= choice <= len(stories):
-                story_name = stories[choice - 1]
-                db[story_name]['is_complete'] = not db[story_name].get('is_complete', False)
-                save_stories_db(db)
-                print(f"✅ '{story_name}' marked as {'Complete' if db[story_name]['is_complete'] else 'Active'}.")
-            else:
-                print("⚠️ Invalid number.")
-        except ValueError:
-            print("⚠️ Please enter a valid number.")
+    stories = list(db)
+    # Status labels are worked out once and only the toggled entry is updated afterwards
+    statuses = ["Complete" if db[name].get('is_complete') else "Active" for name in stories]
+    dirty = False
+    try:
+        while True:
+            print("\nYour tracked stories:")
+            for i, (name, status) in enumerate(zip(stories, statuses)):
+                print(f"  {i+1}: {name} ({status})")
+            print("  0: Back to Main Menu")
+            try:
+                choice = int(input("\nEnter number to toggle status: ").strip())
+                if choice == 0:
+                    break
+                if 1 <= choice <= len(stories):
+                    story_name = stories[choice - 1]
+                    entry = db[story_name]
+                    entry['is_complete'] = not entry.get('is_complete', False)
+                    dirty = True
+                    statuses[choice - 1] = "Complete" if entry['is_complete'] else "Active"
+                    print(f"✅ '{story_name}' marked as {statuses[choice - 1]}.")
+                else:
+                    print("⚠️ Invalid number.")
+            except ValueError:
+                print("⚠️ Please enter a valid number.")
+    finally:
+        # Toggles are saved in one write when leaving the menu, however it is left
+        if dirty:
+            save_stories_db(db)
+
+def _git_blob_sha(path):
+    """Returns the git blob SHA of a local file, or None if it doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+def _load_listing_cache(repo_url):
+    """Returns the cached GitHub listing for repo_url, or None if there isn't a usable one."""
+    try:
+        with open(LISTING_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return cache if cache.get("url") == repo_url and cache.get("etag") else None
+
+def _save_listing_cache(repo_url, etag, files):
+    """Remembers a GitHub listing and its ETag for the next conditional request."""
+    try:
+        with open(LISTING_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"url": repo_url, "etag": etag, "files": files}, f)
+    except OSError as e:
+        print(f"⚠️ Could not cache the GitHub listing: {e}")
+
+def _auth_headers(url, token):
+    """Returns the Authorization header for url, but only when it is an HTTPS request to the GitHub API."""
+    parts = urlsplit(url)
+    if token and parts.scheme == "https" and parts.hostname == GITHUB_API_HOST:
+        return {"Authorization": f"Bearer {token}"}
+    return {}
 
 def update_site_configs(config):
     """Downloads the latest site configuration files from GitHub."""
@@ -38,6 +86,8 @@ def update_site_configs(config):
     if not REQUESTS_INSTALLED:
         if not check_and_install_dependencies(['requests']):
             return
+
+    import requests
             
     print("\n" + "─"*10 + " Update Site Configurations " + "─"*10)
     repo_url = config.get('github_repo_url', "https://api.github.com/repos/crua9/Web-Novel-Scraper-Suite/contents/site_configs")
@@ -50,23 +100,59 @@ def update_site_configs(config):
         save_config(config)
     
     try:
-        response = requests.get(repo_url)
-        response.raise_for_status()
-        files = response.json()
+        # One pooled session keeps connections to GitHub alive across all requests,
+        # with a pool large enough that every download worker can hold its own
+        session = requests.Session()
+        session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=DOWNLOAD_WORKERS, pool_maxsize=DOWNLOAD_WORKERS))
+        session.headers["Accept"] = "application/vnd.github+json"
+        # A personal access token raises GitHub's limit from 60 to 5000 requests per hour.
+        # It is attached per request and only for api.github.com, never to download hosts or a custom URL.
+        token = os.environ.get("GITHUB_TOKEN") or config.get("github_pat")
+        # Conditional request: a 304 means the listing is unchanged and costs no rate limit
+        cache = _load_listing_cache(repo_url)
+        listing_headers = _auth_headers(repo_url, token)
+        if cache:
+            listing_headers["If-None-Match"] = cache["etag"]
+        response = session.get(repo_url, headers=listing_headers)
+        if response.status_code == 304:
+            files = cache["files"]
+        else:
+            remaining = response.headers.get("X-RateLimit-Remaining")
+            if remaining is not None and int(remaining) < 10:
+                print(f"⚠️ Only {remaining} GitHub API requests left this hour. Add a token as 'github_pat' in config.json to raise the limit.")
+            response.raise_for_status()
+            files = response.json()
+            if response.headers.get("ETag"):
+                _save_listing_cache(repo_url, response.headers["ETag"], files)
         
+        # The listing already carries each file's git blob SHA, so unchanged files are skipped
+        py_files = [
+            f for f in files
+            if f['type'] == 'file' and f['name'].endswith('.py')
+            and f.get('sha') != _git_blob_sha(os.path.join("site_configs", f['name']))
+        ]
+        for file_info in py_files:
+            print(f"  -> Downloading {file_info['name']}...")
+
+        def download(file_info):
+            file_response = session.get(file_info['download_url'], headers=_auth_headers(file_info['download_url'], token))
+            file_response.raise_for_status()
+            return file_info['name'], file_response.content
+
+        # Fetch the files in parallel, then write them one by one
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            downloads = list(executor.map(download, py_files))
+
         updated = 0
-        for file_info in files:
-            if file_info['type'] == 'file' and file_info['name'].endswith('.py'):
-                print(f"  -> Downloading {file_info['name']}...")
-                file_content = requests.get(file_info['download_url']).text
-                with open(os.path.join("site_configs", file_info['name']), 'w', encoding='utf-8') as f:
-                    f.write(file_content)
-                updated += 1
+        for name, file_content in downloads:
+            with open(os.path.join("site_configs", name), 'wb') as f:
+                f.write(file_content)
+            updated += 1
                 
         if updated > 0:
-            print(f"\n✅ Updated {updated} file(s). Restart the script for changes to take effect.")
+            print(f"\n✅ Updated {updated} file(s). The new versions will be used from now on.")
         else:
-            print("\nNo new configuration files found.")
+            print("\n✅ All configuration files are already up to date.")
             
     except Exception as e:
         print(f"❌ Error fetching from GitHub: {e}")
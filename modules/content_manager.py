@@ -1,11 +1,21 @@
 import os
 import re
-import time
-from playwright.sync_api import sync_playwright, TimeoutError
+import hashlib
+import asyncio
 from .utils import (
-    load_stories_db,
+    load_stories_db, save_stories_db, list_link_files, rewrite_lines, get_url_host,
+    open_chapter_cache, get_cached_chapter, store_cached_chapter, CHAPTER_CACHE_COMMIT_INTERVAL, CHAPTER_CACHE_TTL,
+    block_heavy_resources,
 )
 
+# --- Precompiled Patterns ---
+_CHAPTER_HEADER_RE = re.compile(r"^---\s*(.*?)\s*---\s*$")
+_DONE_ENTRY_RE = re.compile(r"✔\s*(.*?)\s+(https?://\S+)")
+
+# --- Constants ---
+CHECKPOINT_INTERVAL = 10 # Successful chapters to hold in memory before writing progress to disk
+DEFAULT_SCRAPE_CONCURRENCY = 3 # Browser tabs scraping chapters at the same time
+
 def assemble_chapter_list():
     """
     Assembles a master chapter_list.txt from individual link files for a selected project.
@@ -30,17 +40,10 @@ def assemble_chapter_list():
         print("⚠️ Invalid choice."); return
 
     links_dir = os.path.join(project_folder, 'links')
-    if not os.path.exists(links_dir) or not os.listdir(links_dir):
+    link_files = list_link_files(links_dir) if os.path.isdir(links_dir) else []
+    if not link_files:
         print(f"❌ No link files found for '{project_folder}'."); return
 
-    try:
-        link_files = sorted(
-            [f for f in os.listdir(links_dir) if f.endswith('.txt')],
-            key=lambda x: int(re.search(r'(\d+)-\d+\.txt$', x).group(1)) if re.search(r'(\d+)-\d+\.txt$', x) else 0
-        )
-    except Exception:
-        link_files = sorted([f for f in os.listdir(links_dir) if f.endswith('.txt')])
-
     print("\nWhich link files do you want to assemble?")
     for i, filename in enumerate(link_files):
         print(f"  {i+1}: {filename}")
@@ -66,20 +69,11 @@ def assemble_chapter_list():
     print(f"\nAssembling the following files:")
     for f in selected_files: print(f"  - {f}")
 
-    links_from_selection = []
-    for filename in selected_files:
-        filepath = os.path.join(links_dir, filename)
-        try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                links_from_selection.extend([line.strip() for line in f if line.strip()])
-        except IOError as e:
-            print(f"❌ Error reading file {filepath}: {e}")
-
+    selected_paths = [os.path.join(links_dir, filename) for filename in selected_files]
     chapter_list_path = os.path.join(project_folder, 'chapter_list.txt')
     file_exists = os.path.exists(chapter_list_path)
     
     write_mode = 'w'
-    links_to_write = links_from_selection
     action_verb = "create"
 
     if file_exists:
@@ -91,13 +85,34 @@ def assemble_chapter_list():
         if action_choice == '2':
             write_mode = 'a'
             action_verb = "append"
-            with open(chapter_list_path, 'r', encoding='utf-8') as f:
-                existing_links = [line.strip() for line in f.readlines()]
-            links_to_write = [link for link in links_from_selection if not link.startswith("✔") and link not in existing_links and "[DEAD LINK]" not in link]
         elif action_choice == '1':
              action_verb = "overwrite"
         else:
             print("⚠️ Invalid choice. Operation cancelled."); return
+
+    if write_mode == 'w':
+        # Overwriting needs no de-duplication, so stream the link files straight through
+        try:
+            link_count = _copy_link_files(selected_paths, chapter_list_path)
+        except IOError as e:
+            print(f"❌ Failed to write to file: {e}"); return
+        if not link_count:
+            print(f"\n✅ No new links to {action_verb}. The selected files are empty, so `chapter_list.txt` was left unchanged."); return
+        print(f"✅ Successfully created `chapter_list.txt` with {link_count} links.")
+        return
+
+    links_from_selection = []
+    for filepath in selected_paths:
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                links_from_selection.extend([line.strip() for line in f if line.strip()])
+        except IOError as e:
+            print(f"❌ Error reading file {filepath}: {e}")
+
+    with open(chapter_list_path, 'r', encoding='utf-8') as f:
+        existing_links = {line.strip() for line in f}
+    # dict.fromkeys drops links repeated across the selected files while keeping their order
+    links_to_write = [link for link in dict.fromkeys(links_from_selection) if not link.startswith("✔") and link not in existing_links and "[DEAD LINK]" not in link]
             
     if not links_to_write:
         print(f"\n✅ No new links to {action_verb}. `chapter_list.txt` is already up-to-date with the selected files."); return
@@ -105,126 +120,259 @@ def assemble_chapter_list():
     print(f"\nPreparing to {action_verb} {len(links_to_write)} links...")
     
     try:
-        final_mode = 'w' if write_mode == 'w' else 'a'
-        with open(chapter_list_path, final_mode, encoding='utf-8') as f:
-            if final_mode == 'w':
-                 f.truncate(0)
-            for link in links_to_write:
-                f.write(link + '\n')
-        
-        if final_mode == 'w':
-             print(f"✅ Successfully created `chapter_list.txt` with {len(links_to_write)} links.")
-        else:
-             print(f"✅ Successfully appended {len(links_to_write)} new links to `chapter_list.txt`.")
+        with open(chapter_list_path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(links_to_write) + '\n')
+        print(f"✅ Successfully appended {len(links_to_write)} new links to `chapter_list.txt`.")
 
     except IOError as e:
         print(f"❌ Failed to write to file: {e}")
 
+def _copy_link_files(source_paths, dest_path):
+    """
+    Copies link files into a temporary sibling of dest_path, counting links as it goes, and swaps it
+    into place only if at least one link was written, so an empty selection or a failed write leaves
+    the existing list untouched. Returns the number of links written.
+    """
+    tmp_path = dest_path + '.tmp'
+    link_count = 0
+    try:
+        with open(tmp_path, 'wb') as master:
+            for path in source_paths:
+                try:
+                    with open(path, 'rb') as chunk:
+                        lines = chunk.readlines()
+                except IOError as e:
+                    print(f"❌ Error reading file {path}: {e}"); continue
+                master.writelines(lines)
+                link_count += sum(1 for line in lines if line.strip())
+                # Hand-edited files may lack a trailing newline; keep links on separate lines
+                if lines and not lines[-1].endswith(b'\n'):
+                    master.write(b'\n')
+        if link_count:
+            os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return link_count
+
 # --- Start of Merged Logic from Original Script ---
 
+# Reads notes, title and content in one round-trip, removing the notes so they don't leak into the content.
+_EXTRACT_CHAPTER_JS = """({title, content, notes}) => {
+    const notesEl = document.querySelector(notes);
+    const authorNotes = notesEl ? notesEl.innerText.trim() : null;
+    notesEl?.remove();
+    const titleEl = document.querySelector(title);
+    const contentEl = document.querySelector(content);
+    return {
+        title: titleEl ? titleEl.innerText.trim() : "Untitled Chapter",
+        content: contentEl ? contentEl.innerText.trim() : "",
+        notes: authorNotes,
+    };
+}"""
+
+# (content, title, author's notes) selectors, keyed by host without 'www.'
+_CHAPTER_SELECTORS = {
+    "scribblehub.com": ("#chp_raw", "div.chapter-title", ".wi_authornotes"),
+    "royalroad.com": (".chapter-content", "h1", ".author-note-portlet"),
+}
+
 def _get_site_config(url):
-    """Returns the correct CSS selectors for content and title based on the URL."""
-    if "scribblehub.com" in url:
-        return "#chp_raw", "div.chapter-title"
-    elif "royalroad.com" in url:
-        return ".chapter-content", "h1"
-    return None, None
-
-def _scrape_chapter_content_internal(page, url, timeout_ms):
+    """Returns the CSS selectors for content, title and author's notes based on the URL's host."""
+    host = get_url_host(url).removeprefix("www.")
+    return _CHAPTER_SELECTORS.get(host, (None, None, None))
+
+async def _scrape_chapter_content_internal(page, url, timeout_ms):
     """Navigates to a URL and scrapes title, content, and author's notes."""
     try:
-        content_selector, title_selector = _get_site_config(url)
+        content_selector, title_selector, notes_selector = _get_site_config(url)
         if not content_selector:
             print(f"⚠️ Unsupported site: {url}")
             return None, None, None
 
-        page.goto(url, timeout=timeout_ms)
-        try:
-            page.get_by_role("button", name="Got it!").click(timeout=3000)
-        except Exception:
-            pass 
-        try:
-            page.get_by_role("button", name="Yes, I am 18 years or older").click(timeout=3000)
-        except Exception:
-            pass
-
-        page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
-        page.wait_for_selector(title_selector, state="attached", timeout=timeout_ms)
-        page.wait_for_selector(content_selector, state="attached", timeout=timeout_ms)
-
-        author_notes = None
-        if "scribblehub.com" in url:
-            notes_element = page.query_selector('.wi_authornotes')
-            if notes_element:
-                author_notes = notes_element.inner_text().strip()
-                page.evaluate("document.querySelector('.wi_authornotes')?.remove()")
-        elif "royalroad.com" in url:
-            notes_element = page.query_selector('.author-note-portlet')
-            if notes_element:
-                author_notes = notes_element.inner_text().strip()
-                page.evaluate("document.querySelector('.author-note-portlet')?.remove()")
-
-        title_element = page.query_selector(title_selector)
-        title = title_element.inner_text().strip() if title_element else "Untitled Chapter"
-
-        content_element = page.query_selector(content_selector)
-        content = content_element.inner_text().strip() if content_element else ""
-
-        return title, content, author_notes
+        # Only the HTML matters; images and scripts finishing later don't change the text
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+        # Dismiss consent/age banners only if they're on the page, instead of waiting out a timeout every chapter
+        for button_name in ("Got it!", "Yes, I am 18 years or older"):
+            button = page.get_by_role("button", name=button_name)
+            try:
+                if await button.count():
+                    await button.first.click(timeout=1000, no_wait_after=True)
+            except Exception:
+                pass
+
+        await page.wait_for_selector(content_selector, state="attached", timeout=timeout_ms)
+
+        chapter = await page.evaluate(
+            _EXTRACT_CHAPTER_JS, {"title": title_selector, "content": content_selector, "notes": notes_selector}
+        )
+        return chapter["title"], chapter["content"], chapter["notes"]
     except Exception as e:
         print(f"❌ Error loading or scraping {url}: {type(e).__name__} - {e}")
         return None, None, None
 
+async def _scrape_in_browser(urls_to_scrape, concurrency, on_success):
+    """
+    Scrapes (index, url) pairs with a pool of browser tabs sharing one browser.
+    Each URL is retried up to three times; on_success(index, url, title, content, author_notes)
+    is called for every scraped chapter. Returns the list of URLs that failed.
+    """
+    queue = asyncio.Queue()
+    for item in urls_to_scrape: queue.put_nowait(item)
+    total_to_scrape = len(urls_to_scrape)
+    started = 0
+    failed_urls = []
+
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False)
+        # One shared context, so a cookie banner dismissed in one tab stays dismissed in the others.
+        context = await browser.new_context()
+        await context.route("**/*", block_heavy_resources)
+
+        async def worker():
+            nonlocal started
+            page = await context.new_page()
+            while not queue.empty():
+                index, url = queue.get_nowait()
+                started += 1
+                print(f"\nScraping [{started}/{total_to_scrape}]: {url}")
+                delay = 2
+                for attempt in range(3):
+                    timeout = (attempt + 1) * 20000
+                    title, content, author_notes = await _scrape_chapter_content_internal(page, url, timeout)
+                    if title and content is not None:
+                        on_success(index, url, title, content, author_notes)
+                        break
+                    print(f"  -> Retry {attempt + 1} failed for {url}. Waiting {delay}s...")
+                    await asyncio.sleep(delay)
+                    delay *= 2
+                else: # This block runs if the for loop completes without a 'break'
+                    print(f"⛔ All retries failed for: {url}")
+                    failed_urls.append(url)
+            await page.close()
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total_to_scrape)))))
+        await browser.close()
+    return failed_urls
+
+async def _scrape_all(urls_to_scrape, concurrency, on_success, use_cache=True):
+    """
+    Hands over chapters found in the chapter cache without loading anything, then scrapes
+    the rest in the browser and caches them. With use_cache off every chapter is scraped fresh,
+    but the results still refresh the cache. Returns the list of URLs that failed.
+    """
+    cache = open_chapter_cache()
+    uncommitted = 0
+
+    def scraped(index, url, title, content, author_notes):
+        nonlocal uncommitted
+        store_cached_chapter(cache, url, title, content, author_notes)
+        uncommitted += 1
+        if uncommitted >= CHAPTER_CACHE_COMMIT_INTERVAL:
+            cache.commit()
+            uncommitted = 0
+        on_success(index, url, title, content, author_notes)
+
+    pending = []
+    for index, url in urls_to_scrape:
+        cached = get_cached_chapter(cache, url) if use_cache else None
+        if cached:
+            print(f"💾 Loaded from cache: {url}")
+            on_success(index, url, *cached)
+        else:
+            pending.append((index, url))
+
+    try:
+        # The browser is only started if something still needs scraping
+        return await _scrape_in_browser(pending, concurrency, scraped) if pending else []
+    finally:
+        # Whatever was scraped stays cached, even if the run is interrupted
+        cache.commit()
+        cache.close()
+
 def _parse_input_file(filepath):
     """Reads chapter_list.txt and returns a list of tuples: (line_index, title_if_scraped, url)."""
     entries = []
     with open(filepath, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f.readlines()):
+        for i, line in enumerate(f):
             line = line.strip()
             if not line: continue
-            match = re.match(r"✔\s*(.*?)\s+(https?://\S+)", line)
+            match = _DONE_ENTRY_RE.match(line)
             if match:
                 entries.append((i, match.group(1).strip(), match.group(2).strip()))
             else:
                 entries.append((i, None, line))
     return entries
 
-def _update_input_file(filepath, index, title, url):
-    """Marks a chapter as completed in chapter_list.txt."""
-    with open(filepath, "r", encoding="utf-8") as f: lines = f.readlines()
-    lines[index] = f"✔ {title} {url}\n"
-    with open(filepath, "w", encoding="utf-8") as f: f.writelines(lines)
-
-def _append_to_output_file(filepath, title, content):
-    """Appends a single formatted chapter to the output file."""
+def _mark_chapters_done(filepath, completed):
+    """Marks a batch of chapters as completed in chapter_list.txt. `completed` maps line index -> (title, url)."""
+    if not completed: return
+    def mark(index, line):
+        if index not in completed: return line
+        title, url = completed[index]
+        return f"✔ {title} {url}\n"
+    rewrite_lines(filepath, mark)
+
+def _append_chapters(filepath, chapters):
+    """Appends a batch of (title, text) chapters to a file in a single write."""
+    if not chapters: return
     with open(filepath, "a", encoding="utf-8") as f:
-        f.write(f"\n--- {title} ---\n\n{content}\n")
+        f.write("".join(f"\n--- {title} ---\n\n{text}\n" for title, text in chapters))
 
-def _append_to_notes_file(filepath, title, notes):
-    """Appends a chapter's author notes to the specified file."""
-    with open(filepath, "a", encoding="utf-8") as f:
-        f.write(f"\n--- {title} ---\n\n{notes}\n")
+def _flush_checkpoint(output_file, notes_output_file, input_filepath, pending_chapters, pending_notes, pending_marks):
+    """
+    Writes buffered chapters and notes (both index -> (title, text)) and completion marks to disk, then clears the buffers.
+    Each batch of chapters and notes is written in chapter-list order.
+    """
+    # Chapter text goes to disk before the ✔ marks, so an interrupted flush can only cause a re-scrape.
+    _append_chapters(output_file, [pending_chapters[i] for i in sorted(pending_chapters)])
+    if notes_output_file:
+        _append_chapters(notes_output_file, [pending_notes[i] for i in sorted(pending_notes)])
+    _mark_chapters_done(input_filepath, pending_marks)
+    pending_chapters.clear(); pending_notes.clear(); pending_marks.clear()
 
 def _parse_output_file(filepath):
     """Reads an existing output file and parses its chapters into a dictionary."""
     chapters = {}
     if not os.path.exists(filepath): return chapters
-    with open(filepath, "r", encoding="utf-8") as f: content = f.read()
-    pattern = re.compile(r"---\s*(.*?)\s*---\n\n(.*?)(?=\n---|\Z)", re.DOTALL)
-    for title, text in pattern.findall(content):
-        chapters[title.strip()] = text.strip()
+    title, body = None, []
+    with open(filepath, "r", encoding="utf-8") as f:
+        for line in f:
+            match = _CHAPTER_HEADER_RE.match(line)
+            if match:
+                if title is not None: chapters[title] = "".join(body).strip()
+                title, body = match.group(1).strip(), []
+            elif title is not None:
+                body.append(line)
+    if title is not None: chapters[title] = "".join(body).strip()
     return chapters
 
-def _build_final_file(output_filepath, all_chapters_data, input_filepath):
+def _build_final_file(output_filepath, all_chapters_data, ordered_titles):
     """Writes the final output file from scratch, ensuring correct chapter order."""
-    ordered_titles = [title for _, title, _ in _parse_input_file(input_filepath) if title]
     print(f"\nRebuilding {os.path.basename(output_filepath)} in the correct order...")
-    with open(output_filepath, "w", encoding="utf-8") as f:
+    # Large buffer keeps the many small writes out of the kernel; the swap means a crash never leaves a half-written story
+    tmp_path = output_filepath + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", buffering=1 << 20) as f:
         for title in ordered_titles:
             if title in all_chapters_data:
                 f.write(f"\n--- {title} ---\n\n{all_chapters_data[title]}\n")
+    os.replace(tmp_path, output_filepath)
     print("✅ Final file built successfully.")
 
+def _order_fingerprint(output_filepath, ordered_titles):
+    """Cheap identity of a built output file: its name, size and the chapter order it was built from."""
+    return {
+        "file": os.path.basename(output_filepath),
+        "sha256": hashlib.sha256("\n".join(ordered_titles).encode("utf-8")).hexdigest(),
+        "size": os.path.getsize(output_filepath),
+    }
+
+def _remember_order(db, project_folder, output_filepath, ordered_titles):
+    """Stores the fingerprint of a freshly rebuilt output file in the stories DB."""
+    db[project_folder]["order_fingerprint"] = _order_fingerprint(output_filepath, ordered_titles)
+    save_stories_db(db)
+
 def scrape_story_content(config, site_configs):
     """Main function to orchestrate the scraping process."""
     print("\n" + "─" * 10 + " Scrape Story Content " + "─" * 10)
@@ -263,55 +411,80 @@ def scrape_story_content(config, site_configs):
         notes_output_file = f"{base_name} Author Notes{ext}"
         print(f"🗒️  Author's notes will be saved to: {os.path.basename(notes_output_file)}")
 
+    # The output is known to be in order if it doesn't exist yet or matches the fingerprint of the last build
+    done_titles = [title for _, title, _ in entries if title]
+    output_in_order = (not os.path.exists(output_file)
+                       or db[project_folder].get("order_fingerprint") == _order_fingerprint(output_file, done_titles))
+
     if not urls_to_scrape:
         print("\n✅ All chapters in 'chapter_list.txt' have already been scraped.")
         if os.path.exists(output_file):
+            ordered_titles = done_titles
+            if output_in_order:
+                print("✅ Output file is already in the correct order."); return
             print("\nRunning a final check to ensure correct chapter order...")
             all_chapters = _parse_output_file(output_file)
             if all_chapters:
-                _build_final_file(output_file, all_chapters, input_filepath)
+                _build_final_file(output_file, all_chapters, ordered_titles)
+                _remember_order(db, project_folder, output_file, ordered_titles)
         return
 
+    concurrency = config.get("scrape_concurrency", DEFAULT_SCRAPE_CONCURRENCY)
+    use_cache = config.get("use_chapter_cache", True)
+
     print("\n🧠 Heads up:")
-    print("* A browser window will open — do NOT minimize or close it.")
+    print(f"* A browser window will open with up to {concurrency} tabs — do NOT minimize or close it.")
     print("* The browser will close automatically when finished.")
+    if use_cache:
+        print(f"* Chapters scraped in the last {CHAPTER_CACHE_TTL // 86400} days are reused from the cache. Set \"use_chapter_cache\" to false in config.json to re-scrape edited chapters.")
     input("\nPress Enter to begin scraping...")
 
     scraped_something_new = False
     failed_urls = []
+    # New chapters are kept in memory and flushed in batches.
+    pending_chapters, pending_notes, pending_marks = {}, {}, {}
+    scraped_titles = {}
+    last_written_index = max((index for index, title, _ in entries if title), default=-1)
+
+    def flush():
+        # Appending keeps the file in order only while each batch starts after everything already written
+        nonlocal output_in_order, last_written_index
+        if pending_chapters:
+            output_in_order = output_in_order and min(pending_chapters) > last_written_index
+            last_written_index = max(last_written_index, max(pending_chapters))
+        _flush_checkpoint(output_file, notes_output_file, input_filepath, pending_chapters, pending_notes, pending_marks)
+
+    def record_chapter(index, url, title, content, author_notes):
+        nonlocal scraped_something_new
+        print(f"✅ Scraped: {title}")
+        pending_chapters[index] = (title, content)
+        if save_author_notes and author_notes:
+            print(f"🗒️  Saving author's note for: {title}")
+            pending_notes[index] = (title, author_notes)
+        pending_marks[index] = (title, url)
+        scraped_titles[index] = title
+        scraped_something_new = True
+        if len(pending_marks) >= CHECKPOINT_INTERVAL:
+            flush()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
-        total_to_scrape = len(urls_to_scrape)
-        for i, (index, url) in enumerate(urls_to_scrape):
-            print(f"\nScraping [{i+1}/{total_to_scrape}]: {url}")
-            delay = 2
-            for attempt in range(3):
-                timeout = (attempt + 1) * 20000
-                title, content, author_notes = _scrape_chapter_content_internal(page, url, timeout)
-                if title and content is not None:
-                    print(f"✅ Scraped and appended: {title}")
-                    _append_to_output_file(output_file, title, content)
-                    if save_author_notes and author_notes:
-                        print(f"🗒️  Saving author's note for: {title}")
-                        _append_to_notes_file(notes_output_file, title, author_notes)
-                    _update_input_file(input_filepath, index, title, url)
-                    scraped_something_new = True
-                    break
-                else:
-                    print(f"  -> Retry {attempt + 1} failed. Waiting {delay}s...")
-                    time.sleep(delay)
-                    delay *= 2
-            else: # This block runs if the for loop completes without a 'break'
-                print(f"⛔ All retries failed for: {url}")
-                failed_urls.append(url)
-        browser.close()
+    try:
+        failed_urls = asyncio.run(_scrape_all(urls_to_scrape, concurrency, record_chapter, use_cache))
+    finally:
+        # Persist whatever is buffered, even if the run was interrupted.
+        flush()
 
     if scraped_something_new:
-        print("\nRe-ordering final text file...")
-        all_chapters = _parse_output_file(output_file)
-        _build_final_file(output_file, all_chapters, input_filepath)
+        # Final order comes from the entries already in memory, not a re-read of chapter_list.txt
+        ordered_titles = [t for t in (title or scraped_titles.get(index) for index, title, _ in entries) if t]
+        if output_in_order:
+            print("\n✅ Output already in order — skipping rebuild.")
+        else:
+            print("\nRe-ordering final text file...")
+            _build_final_file(output_file, _parse_output_file(output_file), ordered_titles)
+            # Notes were appended batch by batch too, so they get the same reordering
+            if notes_output_file and os.path.exists(notes_output_file):
+                _build_final_file(notes_output_file, _parse_output_file(notes_output_file), ordered_titles)
+        _remember_order(db, project_folder, output_file, ordered_titles)
 
     saved_count = len(urls_to_scrape) - len(failed_urls)
     skipped_count = len(entries) - len(urls_to_scrape)
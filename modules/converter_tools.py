@@ -1,20 +1,60 @@
 import os
 import re
+import html
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utils import check_and_install_dependencies
 
+# --- Precompiled Patterns ---
+# Titles can't span lines, so a stray '---' in chapter text can't drag a match across paragraphs
+_CHAPTER_HEADER_RE = re.compile(r'\n---[ \t]*([^\r\n]+?)[ \t]*---\n')
+_UNSAFE_FILENAME_CHARS = str.maketrans('', '', '\\/*?:"<>|') # Deletes characters Windows won't allow in filenames
+
+# --- Constants ---
+_NON_STORY_MARKERS = ("chapter_list", "failed") # Text files in a project that aren't scraped story output
+DEFAULT_TTS_WORKERS = 4 # Chapters sent to gTTS at the same time, unless config.json sets 'tts_workers'
+
+def _iter_chapters(full_content):
+    """Yields (title, raw_content) for each '--- Title ---' section, slicing the text as it goes instead of splitting it all up front."""
+    title, start = None, 0
+    for match in _CHAPTER_HEADER_RE.finditer(full_content):
+        if title is not None:
+            yield title, full_content[start:match.start()]
+        title, start = match.group(1).strip(), match.end()
+    if title is not None:
+        yield title, full_content[start:]
+
+def _parse_selection(user_input):
+    """Turns input like '1, 3,' into zero-based indices in one pass, ignoring empty entries. Raises ValueError on non-numbers."""
+    chosen_indices = []
+    for token in user_input.split(','):
+        token = token.strip()
+        if token:
+            chosen_indices.append(int(token) - 1)
+    return chosen_indices
+
+def _list_project_folders():
+    """Returns the project folders in the working directory, using scandir's cached entry types."""
+    with os.scandir('.') as entries:
+        return [e.name for e in entries if e.is_dir() and not e.name.startswith(('.', '_'))]
+
+def _list_story_files(project_folder, include_notes=False):
+    """Returns the scraped story .txt files in a project, skipping chapter lists, failure logs and (by default) author notes."""
+    exclude = _NON_STORY_MARKERS if include_notes else _NON_STORY_MARKERS + ("Author Notes",)
+    with os.scandir(project_folder) as entries:
+        return [
+            e.name for e in entries
+            if e.name.endswith('.txt') and not any(marker in e.name for marker in exclude) and e.is_file()
+        ]
+
 def create_epub_from_files():
     """
     Creates an EPUB ebook from one or more scraped story files.
     """
     print("\n" + "─"*10 + " Create EPUB Ebook " + "─"*10)
 
-    if not check_and_install_dependencies(['ebooklib']):
-        return
-
-    from ebooklib import epub
-
     # --- Project Selection ---
-    project_folders = [d for d in os.listdir('.') if os.path.isdir(d) and not d.startswith('.') and not d.startswith('_')]
+    project_folders = _list_project_folders()
     if not project_folders:
         print("No project folders found."); return
 
@@ -31,7 +71,7 @@ def create_epub_from_files():
         print("⚠️ Invalid choice."); return
 
     # --- File Selection ---
-    story_files = [f for f in os.listdir(project_folder) if f.endswith('.txt') and "chapter_list" not in f and "failed" not in f and "Author Notes" not in f]
+    story_files = _list_story_files(project_folder)
     if not story_files:
         print(f"❌ No story text files found in '{project_folder}'."); return
     
@@ -49,14 +89,19 @@ def create_epub_from_files():
         selected_files = story_files
     else:
         try:
-            chosen_indices = [int(i.strip()) - 1 for i in user_input.split(',')]
-            selected_files = [story_files[i] for i in chosen_indices if 0 <= i < len(story_files)]
+            selected_files = [story_files[i] for i in _parse_selection(user_input) if 0 <= i < len(story_files)]
         except (ValueError, IndexError):
             print("⚠️ Invalid input."); return
 
     if not selected_files:
         print("No valid files selected."); return
 
+    # ebooklib is only checked for and imported once there is something to build
+    if not check_and_install_dependencies(['ebooklib']):
+        return
+
+    from ebooklib import epub
+
     # --- EPUB Metadata ---
     author_name = input("\nEnter the author's name: ").strip() or "Unknown Author"
     book_title = input(f"Enter the book title [default: {project_folder}]: ").strip() or project_folder
@@ -69,24 +114,21 @@ def create_epub_from_files():
 
     # --- Chapter Parsing and Creation ---
     print("\n⚙️ Reading and parsing story files...")
-    full_content = ""
+    parts = []
     for filename in sorted(selected_files):
         try:
-            with open(os.path.join(project_folder, filename), 'r', encoding='utf-8') as f:
-                full_content += f.read()
+            parts.append(Path(project_folder, filename).read_text(encoding='utf-8'))
         except IOError as e:
             print(f"❌ Error reading {filename}: {e}")
             continue
-    
-    raw_chapters = re.split(r'\n---\s*(.*?)\s*---\n', full_content)
+    full_content = "".join(parts)
     
     chapter_data = []
-    if len(raw_chapters) > 1:
-        for i in range(1, len(raw_chapters), 2):
-            title = raw_chapters[i].strip()
-            content = raw_chapters[i+1].strip().replace('\n', '<br/>')
-            if title and content:
-                chapter_data.append({'title': title, 'content': content})
+    for title, content in _iter_chapters(full_content):
+        content = content.strip()
+        if title and content:
+            # Scraped text is plain text, so escape it once here and hand ebooklib well-formed XHTML
+            chapter_data.append({'title': title, 'content': html.escape(content).replace('\n', '<br/>')})
 
     if not chapter_data:
         print("❌ Could not find any chapters in the selected files. Make sure they are formatted with '--- Chapter Title ---'.")
@@ -101,7 +143,9 @@ def create_epub_from_files():
         chapter_content = chap_info['content']
         
         epub_chap = epub.EpubHtml(title=chapter_title, file_name=f'chap_{i+1}.xhtml', lang='en')
-        epub_chap.content = f'<h1>{chapter_title}</h1><p>{chapter_content}</p>'
+        # The TOC and nav titles are escaped by ebooklib itself, only the body markup needs it here.
+        # ebooklib parses chapter content as UTF-8, so it's handed over already encoded
+        epub_chap.content = f'<h1>{html.escape(chapter_title)}</h1><p>{chapter_content}</p>'.encode('utf-8')
         
         book.add_item(epub_chap)
         toc.append(epub.Link(f'chap_{i+1}.xhtml', chapter_title, f'chap_{i+1}'))
@@ -126,7 +170,7 @@ def create_edge_html_from_file():
     """Creates a single HTML file from story text files, formatted for Edge's Read Aloud."""
     print("\n" + "─"*10 + " Create HTML for Read Aloud " + "─"*10)
 
-    project_folders = [d for d in os.listdir('.') if os.path.isdir(d) and not d.startswith('.') and not d.startswith('_')]
+    project_folders = _list_project_folders()
     if not project_folders:
         print("No project folders found."); return
 
@@ -142,7 +186,7 @@ def create_edge_html_from_file():
     except (ValueError, IndexError):
         print("⚠️ Invalid choice."); return
 
-    story_files = [f for f in os.listdir(project_folder) if f.endswith('.txt') and "chapter_list" not in f and "failed" not in f and "Author Notes" not in f]
+    story_files = _list_story_files(project_folder)
     if not story_files:
         print(f"❌ No story text files found in '{project_folder}'."); return
     
@@ -160,8 +204,7 @@ def create_edge_html_from_file():
         selected_files = story_files
     else:
         try:
-            chosen_indices = [int(i.strip()) - 1 for i in user_input.split(',')]
-            selected_files = [story_files[i] for i in chosen_indices if 0 <= i < len(story_files)]
+            selected_files = [story_files[i] for i in _parse_selection(user_input) if 0 <= i < len(story_files)]
         except (ValueError, IndexError):
             print("⚠️ Invalid input."); return
 
@@ -171,26 +214,23 @@ def create_edge_html_from_file():
     book_title = input(f"Enter the HTML page title [default: {project_folder}]: ").strip() or project_folder
     
     print("\n⚙️ Reading and parsing story files...")
-    full_content = ""
+    parts = []
     for filename in sorted(selected_files):
         try:
-            with open(os.path.join(project_folder, filename), 'r', encoding='utf-8') as f:
-                full_content += f.read()
+            parts.append(Path(project_folder, filename).read_text(encoding='utf-8'))
         except IOError as e:
             print(f"❌ Error reading {filename}: {e}")
             continue
+    full_content = "".join(parts)
             
-    raw_chapters = re.split(r'\n---\s*(.*?)\s*---\n', full_content)
-    
-    html_body_content = ""
-    chapter_count = 0
-    if len(raw_chapters) > 1:
-        for i in range(1, len(raw_chapters), 2):
-            title = raw_chapters[i].strip()
-            content = raw_chapters[i+1].strip().replace('\n', '<br />')
-            if title and content:
-                html_body_content += f"<h2>{title}</h2>\n<p>{content}</p>\n\n"
-                chapter_count += 1
+    html_parts = []
+    for title, content in _iter_chapters(full_content):
+        # Escaped like the EPUB builder, so '<' or '&' in chapter text can't break the page or inject markup
+        content = html.escape(content.strip()).replace('\n', '<br />')
+        if title and content:
+            html_parts.append(f"<h2>{html.escape(title)}</h2>\n<p>{content}</p>\n\n")
+    html_body_content = "".join(html_parts)
+    chapter_count = len(html_parts)
     
     if not html_body_content:
         print("❌ Could not find any chapters in the selected files."); return
@@ -203,7 +243,7 @@ def create_edge_html_from_file():
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{book_title}</title>
+    <title>{html.escape(book_title)}</title>
     <style>
         body {{ font-family: sans-serif; line-height: 1.6; max-width: 800px; margin: 20px auto; padding: 0 20px; background-color: #fdfdfd; color: #333; }}
         h1, h2 {{ text-align: center; border-bottom: 1px solid #ccc; padding-bottom: 10px; }}
@@ -211,7 +251,7 @@ def create_edge_html_from_file():
     </style>
 </head>
 <body>
-    <h1>{book_title}</h1>
+    <h1>{html.escape(book_title)}</h1>
     {html_body_content}
 </body>
 </html>"""
@@ -227,16 +267,11 @@ def create_edge_html_from_file():
         print(f"\n❌ An error occurred while writing the HTML file: {e}")
 
 
-def create_mp3s_from_file():
+def create_mp3s_from_file(config):
     """Creates MP3 audio files from a story file using gTTS, one file per chapter."""
     print("\n" + "─"*10 + " Create MP3 Audio Files " + "─"*10)
 
-    if not check_and_install_dependencies(['gtts']):
-        return
-        
-    from gtts import gTTS
-
-    project_folders = [d for d in os.listdir('.') if os.path.isdir(d) and not d.startswith('.') and not d.startswith('_')]
+    project_folders = _list_project_folders()
     if not project_folders:
         print("No project folders found."); return
 
@@ -252,7 +287,7 @@ def create_mp3s_from_file():
     except (ValueError, IndexError):
         print("⚠️ Invalid choice."); return
 
-    story_files = [f for f in os.listdir(project_folder) if f.endswith('.txt') and "chapter_list" not in f and "failed" not in f]
+    story_files = _list_story_files(project_folder, include_notes=True)
     if not story_files:
         print(f"❌ No story text files found in '{project_folder}'."); return
     
@@ -270,48 +305,53 @@ def create_mp3s_from_file():
 
     print("\n⚙️ Reading and parsing story file...")
     try:
-        with open(os.path.join(project_folder, selected_file), 'r', encoding='utf-8') as f:
-            full_content = f.read()
+        full_content = Path(project_folder, selected_file).read_text(encoding='utf-8')
     except IOError as e:
         print(f"❌ Error reading {selected_file}: {e}"); return
         
-    raw_chapters = re.split(r'\n---\s*(.*?)\s*---\n', full_content)
-    
     chapter_data = []
-    if len(raw_chapters) > 1:
-        for i in range(1, len(raw_chapters), 2):
-            title = raw_chapters[i].strip()
-            content = raw_chapters[i+1].strip()
-            if title and content:
-                chapter_data.append({'title': title, 'content': content})
+    for title, content in _iter_chapters(full_content):
+        content = content.strip()
+        if title and content:
+            chapter_data.append({'title': title, 'content': content})
 
     if not chapter_data:
         print("❌ Could not find any chapters in the selected file."); return
 
+    # gTTS is only checked for and imported once there are chapters to convert
+    if not check_and_install_dependencies(['gtts']):
+        return
+        
+    from gtts import gTTS
+
     output_dir = os.path.join(project_folder, "Audio Chapters")
     os.makedirs(output_dir, exist_ok=True)
     print(f"✅ Found {len(chapter_data)} chapters. MP3s will be saved in '{output_dir}'")
     print("\n🚀 Starting conversion (this may take a while)...")
     
     total_chapters = len(chapter_data)
-    for i, chap_info in enumerate(chapter_data):
+
+    def synthesize(i, chap_info):
         title = chap_info['title']
-        content = chap_info['content']
-        
         # Sanitize title for filename
-        safe_title = re.sub(r'[\\/*?:"<>|]', "", title)
+        safe_title = title.translate(_UNSAFE_FILENAME_CHARS)
         filename = f"{i+1:04d} - {safe_title}.mp3"
-        output_path = os.path.join(output_dir, filename)
-        
-        print(f"  [{i+1}/{total_chapters}] Converting: {title}...")
-
-        try:
-            tts = gTTS(text=f"{title}. {content}", lang='en')
-            tts.save(output_path)
-        except Exception as e:
-            print(f"    ❌ FAILED to convert chapter: {title}")
-            print(f"       Reason: {e}")
-            continue
+        tts = gTTS(text=f"{title}. {chap_info['content']}", lang='en')
+        tts.save(os.path.join(output_dir, filename))
+
+    # Each chapter is a separate network round trip to Google, so several run at once.
+    # Progress is printed here on the main thread as each one finishes.
+    workers = max(1, int(config.get("tts_workers", DEFAULT_TTS_WORKERS)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(synthesize, i, chap_info): chap_info['title'] for i, chap_info in enumerate(chapter_data)}
+        for done, future in enumerate(as_completed(futures), 1):
+            title = futures[future]
+            try:
+                future.result()
+                print(f"  [{done}/{total_chapters}] Converted: {title}")
+            except Exception as e:
+                print(f"    ❌ FAILED to convert chapter: {title}")
+                print(f"       Reason: {e}")
             
     print(f"\n🎉 Conversion complete. {total_chapters} chapters processed.")
 
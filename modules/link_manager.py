@@ -1,34 +1,37 @@
 import os
 import re
 import datetime
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 from .utils import (
-    load_config, save_config, get_all_chapter_links,
-    save_chunks, read_all_links_from_folder, load_stories_db, save_stories_db
+    load_config, save_config, get_all_chapter_links, browser_session, find_site_domain, get_site_config,
+    save_chunks, iter_all_links_from_folder, load_stories_db, save_stories_db, rewrite_lines,
+    get_cached_chapter_links, cache_chapter_links
 )
 
+# --- Constants ---
+DEFAULT_UPDATE_WORKERS = 4 # Browsers fetching chapter lists at the same time, unless config.json sets 'update_workers'
+PER_SITE_FETCH_LIMIT = 2 # Chapter list fetches allowed against the same site at once, to stay clear of rate limits
+
 def scrape_new_story_links(config, site_configs):
     """Guides user through scraping links for a new story."""
     print("\n" + "─"*10 + " Scrape Chapter Links " + "─"*10)
     story_url = input("🔗 Enter a ScribbleHub or Royal Road story URL: ").strip()
     
     # Find the correct site config
-    site_config = None
-    domain_key = None
-    for domain, conf in site_configs.items():
-        if domain in story_url:
-            site_config = conf
-            domain_key = domain
-            break
+    domain_key = find_site_domain(story_url, site_configs)
+    site_config = site_configs[domain_key] if domain_key else None
+    # Allow URLs pasted without a scheme, same as find_site_domain
+    parsed_url = urlsplit(story_url if '://' in story_url else f'//{story_url}')
     
     if not site_config:
-        print(f"Error: No site config found for domain '{story_url.split('/')[2]}'")
+        print(f"Error: No site config found for domain '{parsed_url.netloc or story_url}'")
         return
 
-    # Auto-generate a project name from the URL if possible
-    try:
-        default_folder = story_url.strip('/').split('/')[-1].replace('-', ' ').title()
-    except:
-        default_folder = config.get("last_project_folder", "")
+    # Auto-generate a project name from the URL's last path segment if possible
+    slug = parsed_url.path.rstrip('/').rsplit('/', 1)[-1]
+    default_folder = slug.replace('-', ' ').title() if slug else config.get("last_project_folder", "")
     
     project_folder_prompt = f"📂 Enter a main project folder name (e.g., '{default_folder}')"
     if default_folder:
@@ -42,19 +45,20 @@ def scrape_new_story_links(config, site_configs):
         print("⚠️ Project folder name cannot be empty."); return
     
     config["last_project_folder"] = project_folder
-    save_config(config)
     
     try:
         default_chunk_size = config.get("chunk_size", 100)
         chunk_size = int(input(f"🔢 How many links per file? [default: {default_chunk_size}]: ").strip() or default_chunk_size)
         config["chunk_size"] = chunk_size
-        save_config(config)
     except ValueError:
         chunk_size = config.get("chunk_size", 100)
         print(f"⚠️ Invalid number. Using default: {chunk_size}")
+    # Both answers are saved in one write once the prompts are done
+    save_config(config)
 
     print("\n🚀 Starting link scrape...")
     urls = get_all_chapter_links(story_url, site_config, headless=config.get("headless_scraping", True))
+    cache_chapter_links(story_url, urls)
     if not urls:
         print("❌ No chapter links found."); return
 
@@ -70,8 +74,26 @@ def scrape_new_story_links(config, site_configs):
     save_stories_db(db)
     print(f"\n💾 Story '{project_folder}' saved to tracking database.")
 
-def check_for_updates(config, site_configs):
-    """Checks selected active stories for new or removed chapters."""
+def _fetch_links_batch(batch, headless):
+    """Fetches the current chapter links for a batch of (name, story_url, site_config, site_gate) using one browser."""
+    results = {}
+    try:
+        with browser_session(headless=headless) as browser:
+            for name, story_url, site_config, site_gate in batch:
+                with site_gate:
+                    results[name] = get_all_chapter_links(story_url, site_config, browser=browser)
+                cache_chapter_links(story_url, results[name])
+    except Exception as e:
+        print(f"❌ An unexpected error occurred during link scraping: {e}")
+    for name, *_ in batch:
+        results.setdefault(name, [])
+    return results
+
+def check_for_updates(config, site_configs, use_cache=False):
+    """
+    Checks selected active stories for new or removed chapters.
+    The chapter lists are always fetched fresh unless use_cache is set; fresh results still refresh the link cache.
+    """
     print("\n" + "─"*10 + " Check for Updates " + "─"*10)
     db = load_stories_db()
     if not db: print("No stories are currently being tracked."); return
@@ -99,33 +121,59 @@ def check_for_updates(config, site_configs):
     if not stories_to_check: print("No valid stories selected."); return
 
     print(f"\nPreparing to check {len(stories_to_check)} story/stories...")
+    checks = []
+    current_links = {}
+    site_gates = {} # domain -> semaphore shared by every worker fetching from that site
+    for name, data in stories_to_check:
+        domain = find_site_domain(data['story_url'], site_configs)
+        if not domain:
+            continue
+        # An explicit update check must see chapters published in the last few minutes, so the cache isn't read by default
+        cached = get_cached_chapter_links(data['story_url']) if use_cache else None
+        if cached is not None:
+            current_links[name] = cached
+        else:
+            if domain not in site_gates:
+                site_gates[domain] = threading.Semaphore(PER_SITE_FETCH_LIMIT)
+            checks.append((name, data['story_url'], site_configs[domain], site_gates[domain]))
+
+    # Fetching is network bound, so the stories are shared out between several workers. Sync Playwright
+    # objects can't cross threads, so each worker drives its own browser over its share of the stories.
+    if checks:
+        headless = config.get("headless_scraping", True)
+        workers = max(1, min(int(config.get("update_workers", DEFAULT_UPDATE_WORKERS)), len(checks)))
+        batches = [checks[k::workers] for k in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for results in executor.map(lambda batch: _fetch_links_batch(batch, headless), batches):
+                current_links.update(results)
+
+    # The results are gone through in order on the main thread, so the prompts never overlap
     updates_found = False
     for i, (name, data) in enumerate(stories_to_check):
         print(f"\n--- [{i+1}/{len(stories_to_check)}] Checking '{name}' ---")
-        
-        site_config = None
-        for domain, conf in site_configs.items():
-            if domain in data['story_url']:
-                site_config = conf
-                break
-        if not site_config:
+    
+        if name not in current_links:
             print(f"Could not find site config for {data['story_url']}. Skipping."); continue
-        
-        # Pass the headless setting from the config object
-        current_urls = get_all_chapter_links(data['story_url'], site_config, headless=config.get("headless_scraping", True))
+    
+        current_urls = current_links[name]
         if not current_urls: print("Could not retrieve current chapters. Skipping."); continue
-            
-        existing_urls = read_all_links_from_folder(name)
-        current_set, existing_set = set(current_urls), set(existing_urls)
-        new_urls = sorted([url for url in current_urls if url not in existing_set], key=current_urls.index)
         
+        # Only membership and a count are needed, so stream the link files straight into a set
+        existing_set = set()
+        existing_count = 0
+        for url in iter_all_links_from_folder(name):
+            existing_set.add(url)
+            existing_count += 1
+        # Iterating current_urls already yields new chapters in site order
+        new_urls = [url for url in current_urls if url not in existing_set]
+    
         if not new_urls: print("✅ No changes found."); continue
 
         updates_found = True
         print(f"✨ Found {len(new_urls)} new chapters.")
-            
+        
         if input("Update local files? (y/n): ").strip().lower() in ['y', 'yes']:
-            save_chunks(new_urls, name, chunk_size=data['chunk_size'], start_offset=len(existing_urls))
+            save_chunks(new_urls, name, chunk_size=data['chunk_size'], start_offset=existing_count)
             db[name]['last_chapter_count'] = len(current_urls)
             db[name]['last_scraped_date'] = datetime.datetime.now().isoformat()
             save_stories_db(db)
@@ -140,7 +188,8 @@ def check_for_revived_links(config, site_configs):
     db = load_stories_db()
     stories = list(db.keys())
     if not db: print("No stories tracked."); return
-    print("Select a project to check:"); [print(f"  {i+1}: {name}") for i, name in enumerate(stories)]; print("  0: Back")
+    # Each menu is printed with one write instead of a print per line
+    print("\n".join(["Select a project to check:", *(f"  {i+1}: {name}" for i, name in enumerate(stories)), "  0: Back"]))
     try:
         choice = int(input("\nEnter choice: ").strip())
         if choice == 0: return
@@ -150,37 +199,36 @@ def check_for_revived_links(config, site_configs):
     chapter_list_path = os.path.join(project_folder, 'chapter_list.txt')
     if not os.path.exists(chapter_list_path): print(f"❌ No chapter list for '{project_folder}'."); return
     
-    with open(chapter_list_path, 'r', encoding='utf-8') as f: lines = f.readlines()
-    dead_links = [line.strip().replace("[DEAD LINK] ", "") for line in lines if line.startswith("[DEAD LINK]")]
+    with open(chapter_list_path, 'r', encoding='utf-8') as f:
+        dead_links = [line.strip().replace("[DEAD LINK] ", "") for line in f if line.startswith("[DEAD LINK]")]
     if not dead_links: print("✅ No dead links found to check."); return
     
     print(f"Checking {len(dead_links)} dead links for '{project_folder}'...")
     
-    site_config = None
-    for domain, conf in site_configs.items():
-        if domain in db[project_folder]['story_url']:
-            site_config = conf
-            break
+    site_config = get_site_config(db[project_folder]['story_url'], site_configs)
     if not site_config:
         print(f"Could not find site config for this story. Aborting."); return
 
     # Pass the headless setting from the config object
-    live_urls = get_all_chapter_links(db[project_folder]['story_url'], site_config, headless=config.get("headless_scraping", True))
+    story_url = db[project_folder]['story_url']
+    live_urls = get_cached_chapter_links(story_url)
+    if live_urls is None:
+        live_urls = get_all_chapter_links(story_url, site_config, headless=config.get("headless_scraping", True))
+        cache_chapter_links(story_url, live_urls)
     if not live_urls: print("❌ Could not fetch live chapter list."); return
     
-    revived_links = [url for url in dead_links if url in live_urls]
+    # A set makes each membership test constant time instead of a scan of the live list
+    live_set = set(live_urls)
+    revived_links = [url for url in dead_links if url in live_set]
     if not revived_links: print("✅ None of the dead links have been revived."); return
     
-    print("\nThe following links are live again:"); [print(f"  - {url}") for url in revived_links]
+    print("\n".join(["\nThe following links are live again:", *(f"  - {url}" for url in revived_links)]))
     if input("Restore these links? (y/n): ").strip().lower() in ['y', 'yes']:
-        updated_lines = []
-        for line in lines:
+        revived_set = set(revived_links)
+        def restore(_, line):
             stripped_line = line.strip().replace("[DEAD LINK] ", "")
-            if stripped_line in revived_links:
-                updated_lines.append(stripped_line + '\n')
-            else:
-                updated_lines.append(line)
-        with open(chapter_list_path, 'w', encoding='utf-8') as f: f.writelines(updated_lines)
+            return stripped_line + '\n' if line.startswith("[DEAD LINK]") and stripped_line in revived_set else line
+        rewrite_lines(chapter_list_path, restore)
         print(f"✅ Restored {len(revived_links)} links.")
     else: print("Operation cancelled.")
 
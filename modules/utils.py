@@ -1,20 +1,42 @@
 import os
+import copy
 import json
 import subprocess
 import sys
 import importlib
+import importlib.util
 import re
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+import sqlite3
+import time
+import hashlib
+from contextlib import contextmanager
 from urllib.parse import urljoin, urlparse
 
+# --- Optional Fast JSON ---
+try:
+    import orjson
+    ORJSON_INSTALLED = True
+except ImportError:
+    ORJSON_INSTALLED = False
+
+# --- Precompiled Patterns ---
+_CHUNK_FILENAME_RE = re.compile(r'(\d+)-\d+\.txt$')
+# Optional scheme, optional user:password@, then the host up to the port, path, query or fragment
+_URL_HOST_RE = re.compile(r'^(?:[A-Za-z][A-Za-z0-9+.-]*://|//)?(?:[^/?#@]*@)?(\[[^\]/?#]*\]|[^/?#:]*)')
+
 # --- Configuration Management ---
 
+_config_cache = {"stamp": None, "data": None}
+
 def get_config_path():
     """Returns the absolute path to the config.json file."""
     return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.json')
 
 def load_config():
-    """Loads the configuration from config.json, creating it if it doesn't exist."""
+    """
+    Loads config.json, creating it if it doesn't exist. The parsed copy is reused while the file is unchanged on disk;
+    callers always get their own deep copy, so editing it can't change what later loads return.
+    """
     config_path = get_config_path()
     if not os.path.exists(config_path):
         print("Config file not found. Creating a default 'config.json'.")
@@ -22,37 +44,90 @@ def load_config():
             "headless_scraping": True,
             "tracked_stories": {},
             "github_pat": "",
-            "chunk_size": 50
+            "chunk_size": 50,
+            "scrape_concurrency": 3,
+            "use_chapter_cache": True,
+            "tts_workers": 4,
+            "update_workers": 4
         }
-        with open(config_path, 'w') as f:
-            json.dump(default_config, f, indent=4)
+        _json_dump(config_path, default_config)
+        _config_cache.update(stamp=_file_stamp(config_path), data=copy.deepcopy(default_config))
         return default_config
+    stamp = _file_stamp(config_path)
+    if _config_cache["stamp"] == stamp:
+        return copy.deepcopy(_config_cache["data"])
     try:
-        with open(config_path, 'r') as f:
-            return json.load(f)
+        config = _json_load(config_path)
     except json.JSONDecodeError:
         print("⚠️ Error: config.json is corrupted. Please fix or delete it.")
         sys.exit(1)
+    _config_cache.update(stamp=stamp, data=copy.deepcopy(config))
+    return config
+
+def write_file_atomic(path, data):
+    """Writes text or bytes to a temporary sibling file and swaps it into place, so a crash never leaves a half-written file."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data.encode('utf-8') if isinstance(data, str) else data)
+    os.replace(tmp_path, path)
+
+def rewrite_lines(path, transform):
+    """Streams a text file through transform(index, line) into a temporary sibling file, then swaps it into place."""
+    tmp_path = path + '.tmp'
+    with open(path, 'r', encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+        for index, line in enumerate(src):
+            dst.write(transform(index, line))
+    os.replace(tmp_path, path)
+
+def _json_load(path):
+    """Parses a JSON file, using orjson when it is installed. Raises json.JSONDecodeError on bad data."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if ORJSON_INSTALLED else json.loads(data)
+
+def _json_dump(path, obj):
+    """Atomically writes an object as pretty-printed JSON, using orjson when it is installed. Leaves the file alone if it already holds exactly that JSON."""
+    if ORJSON_INSTALLED:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=4).encode('utf-8')
+    # Saves often happen when nothing changed (e.g. "no updates found"), so compare before rewriting
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return
+    except OSError:
+        pass
+    write_file_atomic(path, data)
 
 def save_config(config):
     """Saves the given configuration object to config.json."""
     try:
-        with open(get_config_path(), 'w') as f:
-            json.dump(config, f, indent=4)
+        config_path = get_config_path()
+        _json_dump(config_path, config)
+        _config_cache.update(stamp=_file_stamp(config_path), data=copy.deepcopy(config))
     except Exception as e:
+        # Forget the cached copy, so the next load reads whatever actually is on disk
+        _config_cache.update(stamp=None, data=None)
         print(f"❌ Error saving configuration: {e}")
 
 # --- Dependency Management ---
 
+_installed_packages = set() # Packages already found this session; misses aren't cached since they can be installed later
+
 def install_package(package):
     """Installs a package using pip and handles Playwright-specific setup."""
     try:
         print(f"Installing {package}...")
-        subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
+        # --disable-pip-version-check skips pip's round trip to PyPI about its own version
+        subprocess.check_call([sys.executable, '-m', 'pip', 'install', '--no-input', '--disable-pip-version-check', package])
         if 'playwright' in package:
             print("Playwright library installed. Now installing necessary browser drivers...")
             subprocess.check_call([sys.executable, '-m', 'playwright', 'install'])
             print("✅ Playwright browser drivers installed successfully.")
+        # Let this process see the new package without a restart
+        importlib.invalidate_caches()
+        _installed_packages.add(package)
         print(f"✅ Successfully installed {package}")
         return True
     except subprocess.CalledProcessError as e:
@@ -63,7 +138,14 @@ def install_package(package):
         return False
 
 def check_and_install_dependencies(packages):
-    missing_packages = [pkg for pkg in packages if importlib.util.find_spec(pkg.replace('-', '_')) is None]
+    missing_packages = []
+    for pkg in packages:
+        if pkg in _installed_packages:
+            continue
+        if importlib.util.find_spec(pkg.replace('-', '_')) is None:
+            missing_packages.append(pkg)
+        else:
+            _installed_packages.add(pkg)
     if not missing_packages:
         return True
     print("\n--- ⚠️ Missing Libraries for this Feature ---")
@@ -84,26 +166,68 @@ def check_and_install_dependencies(packages):
 
 SITE_CONFIGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'site_configs')
 
+_site_configs_cache = {"stamp": None, "data": None}
+_site_module_stamps = {} # module name -> file stamp it was last imported at
+
 def load_site_configs():
+    """Loads every site plugin, reusing the previous result while no plugin file was added, removed or edited."""
     configs = {}
     if not os.path.exists(SITE_CONFIGS_DIR):
         os.makedirs(SITE_CONFIGS_DIR)
         return configs
-    for filename in os.listdir(SITE_CONFIGS_DIR):
-        if filename.endswith('.py') and not filename.startswith('__'):
-            module_name = filename[:-3]
-            try:
+    # Stamp each plugin file rather than the folder, so files rewritten in place are noticed too
+    file_stamps = {}
+    with os.scandir(SITE_CONFIGS_DIR) as entries:
+        for e in entries:
+            if e.name.endswith('.py') and not e.name.startswith('__'):
+                st = e.stat()
+                file_stamps[e.name] = (st.st_mtime_ns, st.st_size)
+    stamp = tuple(sorted(file_stamps.items()))
+    if _site_configs_cache["stamp"] == stamp:
+        return _site_configs_cache["data"]
+    for filename, file_stamp in file_stamps.items():
+        module_name = filename[:-3]
+        try:
+            # Only plugins whose file changed since they were imported are re-executed
+            module = sys.modules.get(f'site_configs.{module_name}')
+            if module is None:
                 module = importlib.import_module(f'site_configs.{module_name}')
-                if hasattr(module, 'DOMAIN'):
-                    configs[module.DOMAIN] = {
-                        'get_links': module.get_links,
-                        'get_content': module.get_content,
-                        'reverse_chapters': getattr(module, 'REVERSE_CHAPTERS', False)
-                    }
-            except Exception as e:
-                print(f"❌ Error loading site configuration from {filename}: {e}")
+            elif _site_module_stamps.get(module_name) != file_stamp:
+                module = importlib.reload(module)
+            _site_module_stamps[module_name] = file_stamp
+            if hasattr(module, 'DOMAIN'):
+                configs[module.DOMAIN] = {
+                    'get_links': module.get_links,
+                    'get_content': module.get_content,
+                    'reverse_chapters': getattr(module, 'REVERSE_CHAPTERS', False)
+                }
+        except Exception as e:
+            print(f"❌ Error loading site configuration from {filename}: {e}")
+    _site_configs_cache.update(stamp=stamp, data=configs)
     return configs
 
+def get_url_host(url):
+    """
+    Returns the lowercased host of a URL, with or without a scheme, in one regex match instead of a full urlsplit.
+    Any user info and port are left out, so 'https://user@www.royalroad.com:443/x' gives 'www.royalroad.com'.
+    """
+    return _URL_HOST_RE.match(url).group(1).lower()
+
+def find_site_domain(url, site_configs):
+    """Returns the site_configs key that matches a URL's host, or None if the site isn't supported."""
+    # Allow URLs pasted without a scheme (e.g. 'www.royalroad.com/fiction/...')
+    host = get_url_host(url)
+    bare_host = host[4:] if host.startswith('www.') else host
+    for candidate in (host, bare_host, f'www.{bare_host}'):
+        if candidate in site_configs:
+            return candidate
+    return None
+
+def get_site_config(url, site_configs):
+    """Returns the site configuration for a URL via a host lookup, or None if the site isn't supported."""
+    domain = find_site_domain(url, site_configs)
+    return site_configs[domain] if domain else None
+
 # --- File System Helpers ---
 def ensure_directory_exists(path):
     if not os.path.exists(path):
@@ -114,38 +238,52 @@ def save_chunks(links, story_folder, chunk_size=50, start_offset=0):
     ensure_directory_exists(links_dir)
     print(f"\nSaving links to folder: '{links_dir}'")
     num_links = len(links)
+    sanitized_folder_name = "".join(c for c in os.path.basename(story_folder) if c.isalnum() or c in (' ', '_', '-')).strip()
     for i in range(0, num_links, chunk_size):
         chunk = links[i:i + chunk_size]
         start_num = start_offset + i + 1
         end_num = start_offset + i + len(chunk)
-        sanitized_folder_name = "".join(c for c in os.path.basename(story_folder) if c.isalnum() or c in (' ', '_', '-')).strip()
         filename = f"{sanitized_folder_name} Links {start_num}-{end_num}.txt"
         filepath = os.path.join(links_dir, filename)
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(chunk) + '\n')
+            with open(filepath, 'wb') as f:
+                f.write(('\n'.join(chunk) + '\n').encode('utf-8'))
             print(f"  - Saved chunk {start_num}-{end_num} to '{filename}'")
         except IOError as e:
             print(f"❌ Error writing to file {filepath}: {e}")
     print("✅ All link files saved.")
 
-def read_all_links_from_folder(story_folder):
+def list_link_files(links_dir):
+    """Returns the .txt link files in a folder, sorted by their starting chapter number."""
+    with os.scandir(links_dir) as entries:
+        keyed_files = [
+            (int(m.group(1)) if (m := _CHUNK_FILENAME_RE.search(e.name)) else 0, e.name)
+            for e in entries if e.name.endswith('.txt') and e.is_file()
+        ]
+    keyed_files.sort()
+    return [f for _, f in keyed_files]
+
+def iter_all_links_from_folder(story_folder):
+    """Yields every link from a project's link files in chapter order, without building a list."""
     links_dir = os.path.join(story_folder, 'links')
-    all_links = []
     if not os.path.exists(links_dir):
-        return []
-    link_files = sorted(
-        [f for f in os.listdir(links_dir) if f.endswith('.txt')],
-        key=lambda x: int(re.search(r'(\d+)-\d+\.txt$', x).group(1)) if re.search(r'(\d+)-\d+\.txt$', x) else 0
-    )
-    for filename in link_files:
+        return
+    for filename in list_link_files(links_dir):
         filepath = os.path.join(links_dir, filename)
+        # Link files are small, so each is read in one call and split in C rather than iterated line by line
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                all_links.extend([line.strip() for line in f if line.strip()])
+                lines = f.read().splitlines()
         except IOError as e:
             print(f"❌ Error reading file {filepath}: {e}")
-    return all_links
+            continue
+        for line in lines:
+            link = line.strip()
+            if link:
+                yield link
+
+def read_all_links_from_folder(story_folder):
+    return list(iter_all_links_from_folder(story_folder))
 
 def parse_output_file(story_folder, file_format):
     """Generates a standard output file path within a project folder."""
@@ -154,77 +292,200 @@ def parse_output_file(story_folder, file_format):
     return os.path.join(story_folder, f"{sanitized_name}.{file_format}")
 
 # --- Story Database Management ---
+_stories_db_cache = {"stamp": None, "data": None}
+
 def get_stories_db_path():
     return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'stories_db.json')
 
+def _file_stamp(path):
+    """Returns an (mtime_ns, size) pair used to tell whether a file changed on disk."""
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
 def load_stories_db():
+    """
+    Loads stories_db.json, reusing the parsed copy from memory while the file is unchanged on disk.
+    Callers always get their own deep copy, so editing it can't change what later loads return.
+    """
     db_path = get_stories_db_path()
     if not os.path.exists(db_path):
         return {}
+    stamp = _file_stamp(db_path)
+    if _stories_db_cache["stamp"] == stamp:
+        return copy.deepcopy(_stories_db_cache["data"])
     try:
-        with open(db_path, 'r') as f:
-            return json.load(f)
+        db = _json_load(db_path)
     except json.JSONDecodeError:
         print("⚠️ Error: stories_db.json is corrupted. Returning empty database.")
         return {}
+    _stories_db_cache.update(stamp=stamp, data=copy.deepcopy(db))
+    return db
 
 def save_stories_db(db):
     try:
-        with open(get_stories_db_path(), 'w') as f:
-            json.dump(db, f, indent=4)
+        db_path = get_stories_db_path()
+        _json_dump(db_path, db)
+        _stories_db_cache.update(stamp=_file_stamp(db_path), data=copy.deepcopy(db))
     except Exception as e:
+        _stories_db_cache.update(stamp=None, data=None)
         print(f"❌ Error saving story database: {e}")
 
+# --- Chapter Link Cache ---
+LINKS_CACHE_TTL = 300 # Seconds a fetched chapter list is reused instead of opening the story page again
+_links_cache = {} # story_url -> (fetched_at, links), in front of the files in .cache/links
+
+def get_links_cache_dir():
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'links')
+
+def _links_cache_path(story_url):
+    return os.path.join(get_links_cache_dir(), hashlib.sha256(story_url.encode('utf-8')).hexdigest() + '.json')
+
+def get_cached_chapter_links(story_url, max_age=LINKS_CACHE_TTL):
+    """Returns the chapter links fetched for story_url within max_age seconds, from memory or disk, or None."""
+    entry = _links_cache.get(story_url)
+    if entry is None:
+        try:
+            blob = _json_load(_links_cache_path(story_url))
+            entry = (blob["ts"], blob["urls"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        _links_cache[story_url] = entry
+    fetched_at, links = entry
+    return links if time.time() - fetched_at < max_age else None
+
+def cache_chapter_links(story_url, links):
+    """Remembers a successful chapter link fetch in memory and on disk, so later checks and later runs can skip the browser."""
+    if not links:
+        return
+    entry = (time.time(), links)
+    _links_cache[story_url] = entry
+    try:
+        os.makedirs(get_links_cache_dir(), exist_ok=True)
+        _json_dump(_links_cache_path(story_url), {"url": story_url, "ts": entry[0], "urls": links})
+    except OSError as e:
+        print(f"⚠️ Could not cache chapter links: {e}")
+
+# --- Chapter Content Cache ---
+CHAPTER_CACHE_TTL = 30 * 24 * 60 * 60 # Seconds a scraped chapter is reused before it is scraped again, in case it was edited
+CHAPTER_CACHE_COMMIT_INTERVAL = 10 # Chapters added to the cache before they are committed to disk
+
+def get_chapter_cache_path():
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'chapters.sqlite')
+
+def open_chapter_cache():
+    """Opens (creating if needed) the SQLite cache of scraped chapters, keyed by URL."""
+    path = get_chapter_cache_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cache = sqlite3.connect(path)
+    cache.execute(
+        "CREATE TABLE IF NOT EXISTS chapters(url TEXT PRIMARY KEY, title TEXT, content TEXT, notes TEXT, ts INTEGER)"
+    )
+    return cache
+
+def get_cached_chapter(cache, url, max_age=CHAPTER_CACHE_TTL):
+    """Returns (title, content, author_notes) for a URL scraped within the last max_age seconds, or None."""
+    return cache.execute(
+        "SELECT title, content, notes FROM chapters WHERE url = ? AND ts >= ?",
+        (url, int(time.time()) - max_age),
+    ).fetchone()
+
+def store_cached_chapter(cache, url, title, content, author_notes):
+    """Records a scraped chapter in the cache. The caller decides when to commit."""
+    cache.execute(
+        "INSERT OR REPLACE INTO chapters VALUES (?, ?, ?, ?, ?)",
+        (url, title, content, author_notes, int(time.time())),
+    )
+
+# --- Request Blocking ---
+# Requests the chapter text never needs. Stylesheets stay: innerText depends on them to skip hidden elements.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# Ad, analytics and comment-widget hosts (and their subdomains) that chapter pages load but never need
+BLOCKED_TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+    "adservice.google.com", "adnxs.com", "amazon-adsystem.com", "scorecardresearch.com",
+    "quantserve.com", "disqus.com",
+)
+
+def is_blocked_request(request):
+    """True for image, media, font and tracker requests, which chapter scraping never needs."""
+    return request.resource_type in BLOCKED_RESOURCE_TYPES or get_url_host(request.url).endswith(BLOCKED_TRACKER_HOSTS)
+
+async def block_heavy_resources(route):
+    """Async Playwright route handler that aborts blocked requests and lets everything else through."""
+    if is_blocked_request(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
 # --- Web Scraping Helpers ---
-def get_all_chapter_links(story_url, site_config, headless=True):
+@contextmanager
+def browser_session(headless=True):
+    """Launches a single Chromium instance that can be shared across several link scrapes."""
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless)
+        try:
+            yield browser
+        finally:
+            browser.close()
+
+def get_all_chapter_links(story_url, site_config, headless=True, browser=None):
     """
-    Launches a browser and scrapes chapter links from a story URL using
-    the provided site configuration.
+    Scrapes chapter links from a story URL using the provided site configuration.
+    Opens a page in `browser` if one is given, otherwise launches a browser just for this call.
     """
     if not site_config:
         domain = urlparse(story_url).netloc.replace('www.', '')
         print(f"Error: No site configuration was provided for the domain '{domain}'")
         return []
 
-    print(f"Scraping chapter links from: {story_url}")
-    with sync_playwright() as p:
+    if browser is None:
         try:
-            browser = p.chromium.launch(headless=headless)
-            page = browser.new_page()
-            page.goto(story_url, wait_until='domcontentloaded', timeout=60000)
-            
-            all_links = site_config['get_links'](page)
-            
-            if site_config.get('reverse_chapters'):
-                all_links.reverse()
-            browser.close()
-            print(f"\n✅ Finished scraping. Found {len(all_links)} unique chapter links.")
-            return list(dict.fromkeys(all_links))
+            with browser_session(headless=headless) as own_browser:
+                return get_all_chapter_links(story_url, site_config, browser=own_browser)
         except Exception as e:
             print(f"❌ An unexpected error occurred during link scraping: {e}")
             return []
 
-def scrape_chapter_content(page, url, site_configs, timeout=60000):
-    """
-    Finds the correct site configuration and calls its get_content function.
-    This acts as a router to the site-specific scraping logic.
-    """
-    raw_domain = urlparse(url).netloc
-    domain = raw_domain.replace('www.', '')
-    
-    site_config = site_configs.get(domain) or site_configs.get(raw_domain)
-    
-    if site_config:
-        # Pass the timeout value to the specific get_content function
-        return site_config['get_content'](page, url, timeout)
+    print(f"Scraping chapter links from: {story_url}")
+    page = browser.new_page()
+    try:
+        page.goto(story_url, wait_until='domcontentloaded', timeout=60000)
         
-    return "Error: No config for {domain}", None, None
-
+        # Handlers may return a list or yield links lazily; only reversing needs them all at once
+        all_links = site_config['get_links'](page)
+        
+        if site_config.get('reverse_chapters'):
+            all_links = reversed(list(all_links))
+        # One pass resolves and dedupes. Handlers normally return absolute URLs, which a prefix check
+        # lets through untouched; only relative ones pay for urljoin, so both forms dedupe against each other
+        seen = set()
+        unique_links = []
+        for url in all_links:
+            if not url.startswith(('https://', 'http://')):
+                url = urljoin(story_url, url)
+            if url not in seen:
+                seen.add(url)
+                unique_links.append(url)
+        print(f"\n✅ Finished scraping. Found {len(unique_links)} unique chapter links.")
+        return unique_links
+    except Exception as e:
+        print(f"❌ An unexpected error occurred during link scraping: {e}")
+        return []
+    finally:
+        page.close()
 
 # --- UI Helpers ---
+_progress_bar_state = {"last": None} # The last line drawn by print_progress_bar
+
 def print_progress_bar(iteration, total, prefix='', suffix='', length=50, fill='█'):
-    percent = ("{0:.1f}").format(100 * (iteration / float(total)))
-    filled_length = int(length * iteration // total)
+    percent = f"{100 * iteration / total:.1f}"
+    filled_length = length * iteration // total
+    # Consecutive calls often land on the same bar and percentage; only redraw when the line would change
+    frame = (prefix, suffix, percent, filled_length)
+    if frame == _progress_bar_state["last"] and iteration != total:
+        return
+    _progress_bar_state["last"] = None if iteration == total else frame
     bar = fill * filled_length + '-' * (length - filled_length)
     sys.stdout.write(f'\r{prefix} |{bar}| {percent}% {suffix}')
     sys.stdout.flush()
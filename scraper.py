@@ -1,9 +1,52 @@
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
+import importlib.util
+import sqlite3
 import time
 import sys
 import os
 import re
-
+from urllib.parse import urlsplit
+
+# --- Optional Static Fetching ---
+# Royal Road chapters are plain server-rendered HTML, so with these installed they skip the browser
+try:
+    import httpx
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    STATIC_FETCH_INSTALLED = True
+except ImportError:
+    STATIC_FETCH_INSTALLED = False
+
+# --- Precompiled Patterns ---
+_DONE_ENTRY_RE = re.compile(r"✔\s*(.*?)\s+(https?://\S+)")
+# Matches only the header lines; chapter text is sliced out between consecutive headers in one linear pass
+_CHAPTER_HEADER_RE = re.compile(r"^---[ \t]*(.*?)[ \t]*---\n\n", re.MULTILINE)
+# Plain "selectors { declarations }" rules in a page's inline <style> blocks, and the declaration that hides an element
+_CSS_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+_DISPLAY_NONE_RE = re.compile(r"display\s*:\s*none", re.IGNORECASE)
+
+# --- Constants ---
+SCRAPE_CONCURRENCY = 3 # Chapters loaded at the same time, each in its own browser tab
+INPUT_FLUSH_INTERVAL = 20 # Scraped chapters marked done in memory before chapter_list.txt is rewritten
+OUTPUT_BUFFER_SIZE = 1 << 20 # Bytes of chapter text buffered in memory before the output file is written to
+RETRY_TIMEOUTS_MS = (15000, 15000, 30000) # Page timeout per attempt: two quick tries, then one long one
+BROWSER_STATE_FILE = ".scraper_state.json" # Browser cookies (including cookie consent) kept between runs
+CHAPTER_CACHE_FILE = ".scraper_cache.sqlite" # Every chapter ever scraped, keyed by URL, so re-runs don't load it again
+CACHE_COMMIT_INTERVAL = 10 # Chapters added to the cache before they are committed to disk
+CHAPTER_CACHE_TTL = 30 * 24 * 60 * 60 # Seconds a cached chapter is reused before it is scraped again (same as the suite)
+# Run with --no-cache to scrape every chapter fresh (the results still refresh the cache)
+USE_CHAPTER_CACHE = "--no-cache" not in sys.argv[1:]
+# Requests the chapter text never needs. Stylesheets stay: inner_text depends on them to skip hidden elements.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# Ad, analytics and comment-widget hosts (and their subdomains) that chapter pages load but never need.
+# This script stays standalone, so keep these in step with the copies in modules/utils.py by hand.
+BLOCKED_TRACKER_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "googlesyndication.com", "doubleclick.net",
+    "adservice.google.com", "adnxs.com", "amazon-adsystem.com", "scorecardresearch.com",
+    "quantserve.com", "disqus.com",
+)
+STATIC_FETCH_TIMEOUT = 15 # Seconds allowed for a plain HTTP chapter fetch before falling back to the browser
+STATIC_FETCH_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"}
 
 
 # Confirm chapter_list.txt is ready
@@ -35,63 +78,183 @@ if save_author_notes:
     print(f"🗒️  Author's notes will be saved to: {notes_output_file}")
 
 
-# --- Helper Functions ---
+# --- Site Selectors ---
+# Domain -> (content selector, title selector); subdomains such as www. match too
+SITE_SELECTORS = {
+    "scribblehub.com": ("#chp_raw", "div.chapter-title"),
+    "royalroad.com": (".chapter-content", "h1"),
+}
+_host_selectors = {} # host -> selectors, looked up once per host
 
-def get_site_config(url):
-    """Returns the correct CSS selectors for content and title based on the URL."""
-    if "scribblehub.com" in url:
+# --- Helper Functions ---
 
-        return "#chp_raw", "div.chapter-title"
-    elif "royalroad.com" in url:
-        return ".chapter-content", "h1"  # Content selector, Title selector
-    return None, None
+# Set once the cookie banner has been dismissed (or saved cookies were loaded), so later chapters skip the check
+_banner_dismissed = False
 
-def scrape_chapter_content(page, url, timeout_ms):
-    """Navigates to a URL and scrapes title, content, and author's notes."""
+def get_site_config(url):
+    """Returns the correct CSS selectors for content and title based on the URL's host."""
+    host = urlsplit(url).hostname or ""
+    selectors = _host_selectors.get(host)
+    if selectors is None:
+        selectors = next(
+            (sel for domain, sel in SITE_SELECTORS.items() if host == domain or host.endswith("." + domain)),
+            (None, None),
+        )
+        _host_selectors[host] = selectors
+    return selectors
+
+async def scrape_chapter_content(page, url, timeout_ms):
+    """
+    Navigates to a URL and scrapes title, content, and author's notes.
+    Returns (title, content, author_notes, retriable); only timeouts are worth retrying.
+    """
+    global _banner_dismissed
     try:
         content_selector, title_selector = get_site_config(url)
         if not content_selector:
             print(f"⚠️ Unsupported site: {url}")
-            return None, None, None
-
-        page.goto(url, timeout=timeout_ms)
-
-
-        try:
-            page.get_by_role("button", name="Got it!").click(timeout=3000)
-        except Exception:
-            pass 
-
-        page.wait_for_load_state("domcontentloaded", timeout=timeout_ms)
-
-
-        page.wait_for_selector(title_selector, state="attached", timeout=timeout_ms)
-        page.wait_for_selector(content_selector, state="attached", timeout=timeout_ms)
+            return None, None, None, False
+
+        # Navigation resolves once the DOM is parsed, so no separate load-state wait is needed
+        response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+        if response is not None and response.status == 404:
+            print(f"❌ Chapter not found (404): {url}")
+            return None, None, None, False
+
+        # Only click the cookie banner if it is actually there, and stop looking once it has been dismissed
+        if not _banner_dismissed:
+            try:
+                consent_button = page.get_by_role("button", name="Got it!")
+                if await consent_button.count():
+                    await consent_button.click(timeout=1000, no_wait_after=True)
+                    _banner_dismissed = True
+            except Exception:
+                pass 
+
+        # The title sits above the content, so once the content is attached the title is too
+        await page.wait_for_selector(content_selector, state="attached", timeout=timeout_ms)
 
         author_notes = None
         # --- Extract and Remove Author's Notes ---
         if "scribblehub.com" in url:
-            notes_element = page.query_selector('.wi_authornotes')
+            notes_element = await page.query_selector('.wi_authornotes')
             if notes_element:
-                author_notes = notes_element.inner_text().strip()
-                page.evaluate("document.querySelector('.wi_authornotes')?.remove()")
+                author_notes = (await notes_element.inner_text()).strip()
+                await page.evaluate("document.querySelector('.wi_authornotes')?.remove()")
         elif "royalroad.com" in url:
-            notes_element = page.query_selector('.author-note-portlet')
+            notes_element = await page.query_selector('.author-note-portlet')
             if notes_element:
-                author_notes = notes_element.inner_text().strip()
-                page.evaluate("document.querySelector('.author-note-portlet')?.remove()")
+                author_notes = (await notes_element.inner_text()).strip()
+                await page.evaluate("document.querySelector('.author-note-portlet')?.remove()")
 
-        title_element = page.query_selector(title_selector)
-        title = title_element.inner_text().strip() if title_element else "Untitled Chapter"
+        title_element = await page.query_selector(title_selector)
+        title = (await title_element.inner_text()).strip() if title_element else "Untitled Chapter"
 
-        content_element = page.query_selector(content_selector)
-        content = content_element.inner_text().strip() if content_element else ""
+        content_element = await page.query_selector(content_selector)
+        content = (await content_element.inner_text()).strip() if content_element else ""
 
-        return title, content, author_notes
+        return title, content, author_notes, False
+    except PlaywrightTimeoutError as e:
+        print(f"⌛ Timed out loading {url}: {e}")
+        return None, None, None, True
     except Exception as e:
 
         print(f"❌ Error loading or scraping {url}: {type(e).__name__} - {e}")
-        return None, None, None
+        return None, None, None, False
+
+async def fetch_static(client, url):
+    """
+    Fetches a server-rendered chapter over plain HTTP and scrapes it without a browser.
+    Returns (title, content, author_notes), or None if the browser is needed instead
+    (Cloudflare challenge, error status, or the page doesn't have the expected layout).
+    """
+    content_selector, title_selector = get_site_config(url)
+    if not content_selector:
+        return None
+    try:
+        response = await client.get(url)
+    except httpx.HTTPError:
+        return None
+    if response.status_code != 200:
+        return None
+
+    tree = HTMLParser(response.text)
+    title_node = tree.css_first(title_selector)
+    content_node = tree.css_first(content_selector)
+    if title_node is None or content_node is None:
+        return None
+
+    author_notes = None
+    notes_node = tree.css_first('.author-note-portlet')
+    if notes_node is not None:
+        author_notes = notes_node.text(separator="\n", strip=True)
+        notes_node.decompose()
+
+    # Royal Road slips anti-piracy lines into the chapter and hides them with an inline <style> rule;
+    # the browser's inner_text skips them, so drop them here too
+    if not remove_hidden_nodes(tree, content_node):
+        return None
+
+    # One block per paragraph, matching the blank-line spacing the browser's inner_text gives
+    paragraphs = [text for text in (p.text().strip() for p in content_node.css('p')) if text]
+    content = "\n\n".join(paragraphs) if paragraphs else content_node.text().strip()
+    return title_node.text().strip() or "Untitled Chapter", content, author_notes
+
+def remove_hidden_nodes(tree, content_node):
+    """
+    Removes the elements inside content_node that the page's inline <style> rules or style attributes hide.
+    Returns False if a hiding rule uses a selector the parser can't apply, so the browser is used instead.
+    """
+    hidden_selectors = []
+    for style_node in tree.css('style'):
+        for selectors, declarations in _CSS_RULE_RE.findall(style_node.text()):
+            if _DISPLAY_NONE_RE.search(declarations):
+                hidden_selectors.extend(s.strip() for s in selectors.split(",") if s.strip())
+
+    for selector in hidden_selectors:
+        if selector.startswith("@"):
+            return False
+        try:
+            hidden_nodes = content_node.css(selector)
+        except Exception:
+            return False
+        for node in hidden_nodes:
+            node.decompose()
+
+    for node in content_node.css('[style]'):
+        if _DISPLAY_NONE_RE.search(node.attributes.get('style') or ""):
+            node.decompose()
+    return True
+
+async def block_heavy_resources(route):
+    """Route handler that aborts image, media, font and tracker requests and lets everything else through."""
+    host = urlsplit(route.request.url).hostname or ""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES or host.endswith(BLOCKED_TRACKER_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+def open_chapter_cache(filepath):
+    """Opens (creating if needed) the SQLite cache of scraped chapters."""
+    cache = sqlite3.connect(filepath)
+    cache.execute(
+        "CREATE TABLE IF NOT EXISTS pages(url TEXT PRIMARY KEY, title TEXT, content TEXT, notes TEXT, ts INTEGER)"
+    )
+    return cache
+
+def get_cached_chapter(cache, url, max_age=CHAPTER_CACHE_TTL):
+    """Returns (title, content, author_notes) for a URL scraped within the last max_age seconds, or None."""
+    return cache.execute(
+        "SELECT title, content, notes FROM pages WHERE url = ? AND ts >= ?",
+        (url, int(time.time()) - max_age),
+    ).fetchone()
+
+def store_cached_chapter(cache, url, title, content, author_notes):
+    """Records a scraped chapter in the cache. The caller decides when to commit."""
+    cache.execute(
+        "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+        (url, title, content, author_notes, int(time.time())),
+    )
 
 def parse_input_file(filepath):
     """
@@ -100,13 +263,13 @@ def parse_input_file(filepath):
     """
     entries = []
     with open(filepath, "r", encoding="utf-8") as f:
-        for i, line in enumerate(f.readlines()):
+        for i, line in enumerate(f):
             line = line.strip()
             if not line:
                 continue
 
 
-            match = re.match(r"✔\s*(.*?)\s+(https?://\S+)", line)
+            match = _DONE_ENTRY_RE.match(line)
             if match:
                 title = match.group(1).strip()
                 url = match.group(2).strip()
@@ -116,26 +279,30 @@ def parse_input_file(filepath):
                 entries.append((i, None, line))
     return entries
 
-def update_input_file(filepath, index, title, url):
-    """Marks a chapter as completed in chapter_list.txt."""
+def flush_input_updates(filepath, pending_updates):
+    """Marks every pending chapter as completed in chapter_list.txt with one rewrite, then clears them."""
+    if not pending_updates:
+        return
     with open(filepath, "r", encoding="utf-8") as f:
         lines = f.readlines()
 
-    lines[index] = f"✔ {title} {url}\n"
+    for index, line in pending_updates.items():
+        lines[index] = line
 
-    with open(filepath, "w", encoding="utf-8") as f:
+    # Write a temporary copy and swap it in, so an interrupted save can't truncate the list
+    with open(filepath + ".tmp", "w", encoding="utf-8") as f:
         f.writelines(lines)
+    os.replace(filepath + ".tmp", filepath)
+    pending_updates.clear()
 
-def append_to_output_file(filepath, title, content):
-    """Appends a single formatted chapter to the output file."""
-    with open(filepath, "a", encoding="utf-8") as f:
-        f.write(f"\n--- {title} ---\n\n{content}\n")
+def append_to_output_file(out_file, title, content):
+    """Appends a single formatted chapter to the already-open output file."""
+    out_file.write(f"\n--- {title} ---\n\n{content}\n")
 
 # --- NEW: Function to save author's notes ---
-def append_to_notes_file(filepath, title, notes):
-    """Appends a chapter's author notes to the specified file."""
-    with open(filepath, "a", encoding="utf-8") as f:
-        f.write(f"\n--- {title} ---\n\n{notes}\n")
+def append_to_notes_file(notes_file, title, notes):
+    """Appends a chapter's author notes to the already-open notes file."""
+    notes_file.write(f"\n--- {title} ---\n\n{notes}\n")
 
 def parse_output_file(filepath):
     """Reads an existing output file and parses its chapters into a dictionary."""
@@ -150,38 +317,148 @@ def parse_output_file(filepath):
         content = f.read()
 
 
-    pattern = re.compile(r"---\s*(.*?)\s*---\n\n(.*?)(?=\n---|\Z)", re.DOTALL)
-    matches = pattern.findall(content)
+    headers = list(_CHAPTER_HEADER_RE.finditer(content))
+    ends = [match.start() for match in headers[1:]] + [len(content)]
 
-    for title, text in matches:
-        chapters[title.strip()] = text.strip()
+    for match, end in zip(headers, ends):
+        chapters[match.group(1).strip()] = content[match.end():end].strip()
 
     return chapters
 
-def build_final_file(output_filepath, all_chapters_data, input_filepath):
+def build_final_file(output_filepath, all_chapters_data, ordered_titles):
     """
     Writes the final output file from scratch, ensuring all chapters are in the
     correct order as defined by chapter_list.txt.
     """
 
-    ordered_titles = []
-    entries = parse_input_file(input_filepath)
-    for _, title, _ in entries:
-        if title: 
-            ordered_titles.append(title)
-
-
     print(f"\n rebuilding {output_filepath} in the correct order...")
-    with open(output_filepath, "w", encoding="utf-8") as f:
+    # Write a temporary copy and swap it in, so an interrupted rebuild can't wipe the story file
+    tmp_path = output_filepath + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE) as f:
         for title in ordered_titles:
             if title in all_chapters_data:
                 content = all_chapters_data[title]
                 f.write(f"\n--- {title} ---\n\n{content}\n")
+    os.replace(tmp_path, output_filepath)
     print("✅ Final file built successfully.")
 
 
 # --- Main Scraper Logic ---
 
+async def scrape_all(urls_to_scrape, concurrency, on_success, on_failure):
+    """
+    Scrapes (index, url) pairs with a pool of tabs sharing one browser.
+    URLs cached within CHAPTER_CACHE_TTL are served from it without loading anything, unless --no-cache was given.
+    Each URL gets up to three attempts if it times out; on_success(index, url, title, content, author_notes)
+    is called for every scraped chapter and on_failure(index) for every one given up on.
+    Returns the list of URLs that failed.
+    """
+    started = 0
+    failed_urls = []
+    cache = open_chapter_cache(CHAPTER_CACHE_FILE)
+    uncommitted = 0
+
+    def scraped(index, url, title, content, author_notes):
+        nonlocal uncommitted
+        store_cached_chapter(cache, url, title, content, author_notes)
+        uncommitted += 1
+        # Committing in batches keeps the number of disk syncs down
+        if uncommitted >= CACHE_COMMIT_INTERVAL:
+            cache.commit()
+            uncommitted = 0
+        on_success(index, url, title, content, author_notes)
+
+    # Cache hits are handed over before the browser is even started
+    pending = []
+    for index, url in urls_to_scrape:
+        cached = get_cached_chapter(cache, url) if USE_CHAPTER_CACHE else None
+        if cached:
+            print(f"💾 Loaded from cache: {url}")
+            on_success(index, url, *cached)
+        else:
+            pending.append((index, url))
+    if not pending:
+        cache.close()
+        return failed_urls
+
+    queue = asyncio.Queue()
+    for item in pending:
+        queue.put_nowait(item)
+    total_to_scrape = len(pending)
+
+    global _banner_dismissed
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False)
+        # One shared context, so a cookie banner dismissed in one tab stays dismissed in the others.
+        # Cookies saved by the last run are loaded into it, so the banner usually never shows at all.
+        has_saved_state = os.path.exists(BROWSER_STATE_FILE)
+        _banner_dismissed = has_saved_state
+        context = await browser.new_context(storage_state=BROWSER_STATE_FILE if has_saved_state else None)
+        # Registered on the context, so every tab skips the bytes the scraper never reads
+        await context.route("**/*", block_heavy_resources)
+        # One pooled HTTP client for the static fast path, shared by every worker
+        client = None
+        if STATIC_FETCH_INSTALLED:
+            client = httpx.AsyncClient(
+                headers=STATIC_FETCH_HEADERS,
+                timeout=STATIC_FETCH_TIMEOUT,
+                follow_redirects=True,
+                http2=importlib.util.find_spec("h2") is not None,
+            )
+
+        async def worker():
+            nonlocal started
+            page = await context.new_page()
+            while not queue.empty():
+                index, url = queue.get_nowait()
+                started += 1
+                print(f"\n scraping [{started}/{total_to_scrape}]: {url}")
+
+                # Royal Road pages don't need JavaScript; the browser is only the fallback for them
+                if client and "royalroad.com" in url:
+                    result = await fetch_static(client, url)
+                    if result:
+                        scraped(index, url, *result)
+                        continue
+
+                delay = 1
+                for attempt, timeout in enumerate(RETRY_TIMEOUTS_MS):
+                    title, content, author_notes, retriable = await scrape_chapter_content(page, url, timeout)
+
+                    if title and content is not None:
+                        scraped(index, url, title, content, author_notes)
+                        break
+                    if not retriable:
+                        # A missing page or a broken URL won't fix itself, so don't wait on it
+                        print(f"⛔ Giving up on: {url}")
+                        failed_urls.append(url)
+                        on_failure(index)
+                        break
+                    if attempt + 1 < len(RETRY_TIMEOUTS_MS):
+                        print(f"  -> Retry {attempt + 1} failed for {url}. Waiting {delay}s...")
+                        await asyncio.sleep(delay)
+                        delay *= 2
+                else:
+                    print(f"⛔ All retries failed for: {url}")
+                    failed_urls.append(url)
+                    on_failure(index)
+            await page.close()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total_to_scrape)))))
+        finally:
+            # Whatever was scraped stays cached, even if the run is interrupted
+            cache.commit()
+            cache.close()
+        if client:
+            await client.aclose()
+        try:
+            await context.storage_state(path=BROWSER_STATE_FILE)
+        except Exception as e:
+            print(f"⚠️ Could not save browser cookies: {e}")
+        await browser.close()
+    return failed_urls
+
 def run_scraper(save_notes_flag, notes_file_path):
     """Main function to orchestrate the scraping process."""
     input_filepath = "chapter_list.txt"
@@ -195,7 +472,7 @@ def run_scraper(save_notes_flag, notes_file_path):
         print("\n running a final check to ensure correct chapter order...")
         all_chapters = parse_output_file(output_file)
         if all_chapters:
-            build_final_file(output_file, all_chapters, input_filepath)
+            build_final_file(output_file, all_chapters, [title for _, title, _ in entries])
         return
 
     print("\n🧠 Heads up:")
@@ -204,49 +481,91 @@ def run_scraper(save_notes_flag, notes_file_path):
     input("\nPress Enter to begin scraping...")
 
     scraped_something_new = False
-    failed_urls = []
+    pending_updates = {} # line index -> completed line, written out in batches
+    scraped_titles = {} # line index -> title scraped this run
+    # Chapters that finish early wait here until every chapter before them is settled,
+    # so the output file is written in chapter_list.txt order and normally needs no rebuild
+    scrape_order = [index for index, _ in urls_to_scrape]
+    next_position = 0
+    waiting = {} # line index -> (url, title, content, author_notes), or None once given up on
+    last_written_index = max((index for index, title, _ in entries if title), default=-1)
+    output_in_order = True
+    # Both files stay open for the whole run behind a large buffer instead of being reopened per chapter
+    out_file = open(output_file, "a", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+    notes_file = None # Only opened once there is a note to save
+
+    def flush_progress():
+        """Writes buffered chapters and notes out first, then marks them done in chapter_list.txt."""
+        # This order means a chapter is always on disk before chapter_list.txt says it is done
+        out_file.flush()
+        if notes_file:
+            notes_file.flush()
+        flush_input_updates(input_filepath, pending_updates)
+
+    def write_chapter(index, url, title, content, author_notes):
+        nonlocal scraped_something_new, notes_file, output_in_order, last_written_index
+        print(f"✅ Scraped and appended: {title}")
+        # Appending stays in order only while each chapter comes after everything already written
+        if index < last_written_index:
+            output_in_order = False
+        last_written_index = max(last_written_index, index)
+        append_to_output_file(out_file, title, content)
+        
+        # --- NEW: Save notes if requested and available ---
+        if save_notes_flag and author_notes:
+            print(f"🗒️  Saving author's note for: {title}")
+            if notes_file is None:
+                notes_file = open(notes_file_path, "a", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+            append_to_notes_file(notes_file, title, author_notes)
+
+        pending_updates[index] = f"✔ {title} {url}\n"
+        scraped_titles[index] = title
+        if len(pending_updates) >= INPUT_FLUSH_INTERVAL:
+            flush_progress()
+        scraped_something_new = True
+
+    def write_waiting_chapters():
+        """Writes out every waiting chapter whose predecessors are all written or given up on."""
+        nonlocal next_position
+        while next_position < len(scrape_order) and scrape_order[next_position] in waiting:
+            chapter = waiting.pop(scrape_order[next_position])
+            if chapter:
+                write_chapter(scrape_order[next_position], *chapter)
+            next_position += 1
+
+    # Both run on the event loop thread between awaits, so file writes from different tabs never interleave
+    def on_success(index, url, title, content, author_notes):
+        waiting[index] = (url, title, content, author_notes)
+        write_waiting_chapters()
+
+    def on_failure(index):
+        waiting[index] = None
+        write_waiting_chapters()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        page = browser.new_page()
-
-        total_to_scrape = len(urls_to_scrape)
-        for i, (index, url) in enumerate(urls_to_scrape):
-            print(f"\n scraping [{i+1}/{total_to_scrape}]: {url}")
-
-            delay = 2
-            for attempt in range(3):
-                timeout = (attempt + 1) * 20000
-                title, content, author_notes = scrape_chapter_content(page, url, timeout)
-
-                if title and content is not None:
-                    print(f"✅ Scraped and appended: {title}")
-                    append_to_output_file(output_file, title, content)
-                    
-                    # --- NEW: Save notes if requested and available ---
-                    if save_notes_flag and author_notes:
-                        print(f"🗒️  Saving author's note for: {title}")
-                        append_to_notes_file(notes_file_path, title, author_notes)
-
-                    update_input_file(input_filepath, index, title, url)
-                    scraped_something_new = True
-                    break
-                else:
-                    print(f"  -> Retry {attempt + 1} failed. Waiting {delay}s...")
-                    time.sleep(delay)
-                    delay *= 2
-            else:
-                print(f"⛔ All retries failed for: {url}")
-                failed_urls.append(url)
-
-        browser.close()
+    try:
+        failed_urls = asyncio.run(scrape_all(urls_to_scrape, SCRAPE_CONCURRENCY, on_success, on_failure))
+    finally:
+        # Runs on Ctrl+C too, so finished chapters are never scraped again.
+        # Chapters still stuck behind an unfinished one are written anyway; the next run puts them in order.
+        for index in sorted(waiting):
+            if waiting[index]:
+                write_chapter(index, *waiting[index])
+        waiting.clear()
+        flush_progress()
+        out_file.close()
+        if notes_file:
+            notes_file.close()
 
 
 
     if scraped_something_new:
-        print("\n Re-ordering final text file...")
-        all_chapters = parse_output_file(output_file)
-        build_final_file(output_file, all_chapters, input_filepath)
+        if output_in_order:
+            print("\n✅ Output already in order — skipping rebuild.")
+        else:
+            print("\n Re-ordering final text file...")
+            # The list order comes from the entries parsed at the start plus this run's titles; no second parse
+            ordered_titles = [title or scraped_titles.get(index) for index, title, _ in entries]
+            build_final_file(output_file, parse_output_file(output_file), ordered_titles)
 
 
     saved_count = len(urls_to_scrape) - len(failed_urls)
@@ -1,6 +1,3 @@
-from playwright.sync_api import TimeoutError
-import re
-
 # --- Core Settings ---
 DOMAIN = "www.royalroad.com"
 REVERSE_CHAPTERS = False # Royal Road chapter lists are usually in chronological order
@@ -8,30 +5,26 @@ REVERSE_CHAPTERS = False # Royal Road chapter lists are usually in chronological
 # --- Main Functions ---
 def get_links(page):
     """
-    Scrapes all chapter links from a Royal Road fiction page by parsing
-    the chapter data embedded in the page's script.
+    Scrapes all chapter links from a Royal Road fiction page by reading
+    the chapter data the page's script stores in window.chapters.
     """
     print("🔍 Extracting Royal Road links from page data...")
     
     # Wait for the chapters table to be visible to ensure scripts have loaded
     page.wait_for_selector("#chapters", timeout=30000)
     
-    script_content = page.content()
-    # Find the JavaScript block containing the chapter data
-    match = re.search(r'window\.chapters\s*=\s*(\[.*?\]);', script_content)
+    # Read the array straight from the page instead of serializing the whole DOM and searching it
+    chapters_data = page.evaluate("() => window.chapters")
     
-    if not match:
-        print("❌ Could not find chapter data script block.")
+    if not chapters_data:
+        print("❌ Could not find chapter data on the page.")
         return []
         
     try:
-        # The matched group is a JSON string of a list of chapter objects
-        import json
-        chapters_data = json.loads(match.group(1))
         base_url = "https://www.royalroad.com"
         # Construct the full URL for each chapter
         return [base_url + chapter['url'] for chapter in chapters_data]
-    except (json.JSONDecodeError, KeyError) as e:
+    except (KeyError, TypeError) as e:
         print(f"❌ Failed to parse chapter data: {e}")
         return []
 
@@ -42,31 +35,25 @@ def get_content(page, url):
     """
     page.goto(url, wait_until='domcontentloaded', timeout=60000)
     
+    # One wait for the content; the h1 title above it is parsed by then
+    content_selector = '.chapter-content'
+    content_element = page.wait_for_selector(content_selector, timeout=30000)
+
     # Get the chapter title from the main h1 element
     title_selector = 'h1'
-    page.wait_for_selector(title_selector, timeout=30000)
     title = page.inner_text(title_selector).strip()
 
     # Get the main chapter content
-    content_selector = '.chapter-content'
-    page.wait_for_selector(content_selector, timeout=30000)
-    content_html = page.inner_html(content_selector)
-    
-    # Convert HTML to plain text, preserving paragraph breaks
-    content_text = content_html.replace('</p>', '\n').replace('<p>', '')
-    content_text = re.sub('<[^>]*>', '', content_text).strip()
+    # The browser renders the text itself, keeping paragraph breaks, so no HTML has to be stripped here.
+    # The handle returned by the wait is read directly instead of looking the selector up again.
+    content_text = content_element.inner_text().strip()
 
     # Scrape the author's note, if it exists
     author_note = None
-    try:
-        note_selector = '.author-note'
-        # Use a short timeout because the note may not be present
-        page.wait_for_selector(note_selector, timeout=3000) 
-        note_html = page.inner_html(note_selector)
-        note_text = note_html.replace('</p>', '\n').replace('<p>', '')
-        author_note = re.sub('<[^>]*>', '', note_text).strip()
-    except TimeoutError:
-        # It's normal for a chapter to not have an author's note
-        pass 
+    # The note is part of the same server-rendered HTML as the content, so if it isn't there by now
+    # it isn't coming; a plain lookup avoids waiting out a timeout on every chapter without one
+    note_element = page.query_selector('.author-note')
+    if note_element:
+        author_note = note_element.inner_text().strip()
         
     return title, content_text, author_note
@@ -1,24 +1,68 @@
 from playwright.sync_api import TimeoutError
+import html
 import re
 
+# --- Optional HTML Parser ---
+# libxml2 turns chapter HTML into text in C and copes with entities, comments and scripts
+try:
+    from lxml import html as lxml_html
+    LXML_INSTALLED = True
+except ImportError:
+    LXML_INSTALLED = False
+
+# --- Precompiled Patterns ---
+_TAG_RE = re.compile(r'<[^>]*>')
+
 # --- Core Settings ---
 DOMAIN = "www.scribblehub.com"
 REVERSE_CHAPTERS = True # This method gets links from newest to oldest
+# The chapter title has been both a div and an h1 over time; one selector list matches either
+TITLE_SELECTOR = 'div.chapter-title, h1.chapter-title'
+CONTENT_SELECTOR = '#chp_raw'
+NOTES_SELECTOR = '.wi_authornotes' # Author's notes, nested inside the chapter content
+_HTML_PARSED_JS = "() => document.readyState !== 'loading'"
+# Reads the title, lifts out the author's note and returns the content HTML in a single browser round-trip
+_EXTRACT_CHAPTER_JS = """([titleSelector, contentSelector, notesSelector]) => {
+    const titleEl = document.querySelector(titleSelector);
+    const contentEl = document.querySelector(contentSelector);
+    const notesEl = contentEl ? contentEl.querySelector(notesSelector) : null;
+    const notes = notesEl ? notesEl.innerText.trim() : null;
+    if (notesEl) notesEl.remove();
+    return {
+        title: titleEl ? titleEl.innerText.trim() : '',
+        contentHtml: contentEl ? contentEl.innerHTML : '',
+        notes: notes || null,
+    };
+}"""
+
+# --- Cookie Consent ---
+# The consent cookie lives in the browser context, so the banner only has to be dealt with
+# on the first page of each context; a flag on the context lets every later page skip it.
+def _consent_handled(page):
+    return getattr(page.context, '_sh_consent_handled', False)
+
+def _mark_consent_handled(page):
+    page.context._sh_consent_handled = True
 
 # --- Main Functions ---
 def get_links(page):
     """
     Scrapes all chapter links from a ScribbleHub series page by clicking
     the 'Show All Chapters' button and waiting for the full list to load.
+    The links are yielded one by one rather than returned as a list.
     """
     print("📖 Clicking the 'Show All Chapters' icon...")
     
     # Handle the cookie consent banner first, if it appears
-    try:
-        page.get_by_role("button", name="Got it!").click(timeout=5000)
-        print("✅ Cookie consent accepted.")
-    except TimeoutError:
-        print("👍 No cookie consent banner found or it was already handled.")
+    if _consent_handled(page):
+        print("👍 Cookie consent was already handled in this browser.")
+    else:
+        try:
+            page.get_by_role("button", name="Got it!").click(timeout=5000)
+            print("✅ Cookie consent accepted.")
+        except TimeoutError:
+            print("👍 No cookie consent banner found or it was already handled.")
+        _mark_consent_handled(page)
 
     # Click the icon to load all chapters
     page.locator('i[title="Show All Chapters"]').click()
@@ -28,46 +72,47 @@ def get_links(page):
     page.wait_for_selector("#pagination-mesh-toc", state="hidden", timeout=120000)
     print("✅ Full chapter list loaded.")
     
-    links = page.query_selector_all(".toc_ol .toc_a")
-    base_url = "https://www.scribblehub.com"
-    urls = []
-    for link in links:
-        href = link.get_attribute("href")
-        if href:
-            # Ensure the link is a full URL
-            full_url = href.strip() if href.strip().startswith('http') else base_url + href.strip()
-            urls.append(full_url)
-    return urls
+    # Collect every link in one browser round-trip instead of one call per link;
+    # the .href property is already resolved to a full URL by the browser
+    hrefs = page.eval_on_selector_all(".toc_ol .toc_a", "els => els.map(e => e.href)")
+    yield from (href for href in hrefs if href)
 
 def get_content(page, url):
     """
-    This function is responsible for scraping the title and content of a single
-    ScribbleHub chapter page.
+    This function is responsible for scraping the title, content, and author's note
+    of a single ScribbleHub chapter page.
     """
-    page.goto(url, wait_until='domcontentloaded', timeout=60000)
+    # Return as soon as the response starts arriving instead of waiting for DOMContentLoaded,
+    # which also waits for deferred scripts the scraper never needs
+    page.goto(url, wait_until='commit', timeout=60000)
+    # #chp_raw is in the initial HTML; readyState leaving 'loading' means all of it has been parsed,
+    # so the chapter can't be read while its text is still streaming in
+    page.wait_for_function(_HTML_PARSED_JS, timeout=30000)
 
-    # Handle cookie consent on chapter pages as well
-    try:
-        page.get_by_role("button", name="Got it!").click(timeout=3000)
-    except TimeoutError:
-        pass # No banner found, continue
+    # The title sits above the content, so once the content is there everything can be read at once
+    page.wait_for_selector(CONTENT_SELECTOR, timeout=30000)
 
-    # Get the chapter title
-    title_selector = 'h1.chapter-title'
-    page.wait_for_selector(title_selector, timeout=30000)
-    title = page.inner_text(title_selector).strip()
+    # Handle cookie consent on chapter pages as well, once per browser context
+    if not _consent_handled(page):
+        try:
+            page.get_by_role("button", name="Got it!").click(timeout=3000)
+        except TimeoutError:
+            pass # No banner found, continue
+        _mark_consent_handled(page)
 
-    # Get the chapter content from the specific div
-    content_selector = '#chp_raw'
-    page.wait_for_selector(content_selector, timeout=30000)
-    
-    content_html = page.inner_html(content_selector)
-    
-    # Convert HTML to plain text, preserving paragraph breaks
-    content_text = content_html.replace('</p>', '\n').replace('<p>', '')
-    content_text = re.sub('<[^>]*>', '', content_text).strip()
-    
-    # ScribbleHub does not have a separate, consistent container for author's notes
-    # at the end of a chapter, so we return None for the author_note.
-    return title, content_text, None
+    # The author's note is taken out of the content, so it isn't saved as part of the chapter
+    data = page.evaluate(_EXTRACT_CHAPTER_JS, [TITLE_SELECTOR, CONTENT_SELECTOR, NOTES_SELECTOR])
+    return data['title'], _html_to_text(data['contentHtml']), data['notes']
 
+def _html_to_text(content_html):
+    """Converts chapter HTML to plain text, preserving paragraph breaks."""
+    if LXML_INSTALLED and content_html.strip():
+        doc = lxml_html.fragment_fromstring(content_html, create_parent='div')
+        for element in list(doc.iter('script', 'style')):
+            element.drop_tree()
+        for element in doc.iter('p', 'br'):
+            element.tail = '\n' + (element.tail or '')
+        return doc.text_content().strip()
+    # Chromium serializes tags in lowercase, so a plain replace finds every paragraph end;
+    # the opening <p> tags go in the same single tag-stripping pass as everything else
+    return html.unescape(_TAG_RE.sub('', content_html.replace('</p>', '\n'))).strip()